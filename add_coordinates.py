@@ -1,33 +1,19 @@
-import pandas as pd
+import store
+from gazetteer import add_coordinates
 
-DATA = "final_dataset.csv"
-OUT = "mapped_dataset.csv"
+DATA = "final_dataset"
+OUT = "mapped_dataset"
 
-# Mini geocode lookup for major Indian cities
-city_coords = {
-    "Pune": (18.5204, 73.8567),
-    "Mumbai": (19.0760, 72.8777),
-    "Delhi": (28.6139, 77.2090),
-    "Chennai": (13.0827, 80.2707),
-    "Bangalore": (12.9716, 77.5946),
-    "Hyderabad": (17.3850, 78.4867),
-    "Kolkata": (22.5726, 88.3639),
-    "Ahmedabad": (23.0225, 72.5714),
-    "Jaipur": (26.9124, 75.7873)
-}
+df = store.read_table(DATA)
 
-df = pd.read_csv(DATA)
+# Assign coordinates from the local gazetteer (gazetteer.csv)
+df = add_coordinates(df)
 
-# Assign coordinates
-def geo(city):
-    return city_coords.get(city, (20.5937, 78.9629))  # center of India fallback
+missing = df.loc[df["latitude"].isna(), "city"].astype(str).unique()
+if len(missing):
+    print(f"⚠️ {len(missing)} cities not in gazetteer.csv: {sorted(missing)}")
 
-coords = df["city"].apply(geo)
+store.write_table(OUT, df)
 
-df["latitude"] = coords.apply(lambda x: x[0])
-df["longitude"] = coords.apply(lambda x: x[1])
-
-df.to_csv(OUT, index=False)
-
-print("✅ Mapping complete → mapped_dataset.csv")
+print(f"✅ Mapping complete → {store.table_dir(OUT)}/")
 print(df.head())
@@ -0,0 +1,166 @@
+import heapq
+import json
+import operator
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import store
+
+RULES_PATH = "alert_rules.json"
+
+ALERT_COLUMNS = ["state", "city", "disaster_type", "casualties",
+                 "economic_loss_crores", "response_time_hours", "severity"]
+
+OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda col, value: col.isin(value),
+}
+
+
+# ---------------------------------
+# RULES
+# ---------------------------------
+@dataclass
+class Rule:
+    name: str
+    field: str
+    op: str
+    value: object
+
+    def __post_init__(self):
+        if self.op not in OPS:
+            raise ValueError(f"Unknown operator '{self.op}' in rule '{self.name}'")
+
+    def mask(self, df):
+        if self.field not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        col = df[self.field]
+        if self.op != "in" and isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype(col.cat.categories.dtype)
+        return np.asarray(OPS[self.op](col, self.value), dtype=bool)
+
+
+def load_config(path=RULES_PATH):
+    with open(path) as f:
+        config = json.load(f)
+    config["rules"] = [Rule(**r) for r in config["rules"]]
+    return config
+
+
+# ---------------------------------
+# ENGINE
+# ---------------------------------
+class AlertEngine:
+    """Evaluates alert rules on newly arriving incidents only.
+
+    Active alerts live in a dict keyed by the dedup key (``incident_id`` by
+    default); an incident that fires again refreshes its alert rather than
+    adding a second one. A min-heap of expiry times makes expiry cost
+    proportional to the number of alerts that actually expire.
+    """
+
+    def __init__(self, rules=None, ttl_hours=24, key="incident_id", table="final_dataset"):
+        if rules is None:
+            config = load_config()
+            rules, ttl_hours, key = config["rules"], config["ttl_hours"], config["key"]
+        self.rules = rules
+        self.ttl = ttl_hours * 3600
+        self.key = key
+        self.table = table
+
+        self.active = {}
+        self._expiry = []
+        self.version = None
+        self.evaluated = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _keys(self, df):
+        if self.key in df.columns:
+            return df[self.key].to_numpy()
+        # no id column: fall back to a content hash of the row
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    def ingest(self, df, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.evaluated += len(df)
+            if df.empty:
+                return 0
+
+            masks = np.column_stack([r.mask(df) for r in self.rules])
+            fired = masks.any(axis=1)
+            if not fired.any():
+                return 0
+
+            hits = df[fired]
+            keys = self._keys(hits)
+            names = np.array([r.name for r in self.rules], dtype=object)
+            cols = [c for c in ALERT_COLUMNS if c in hits.columns]
+            records = hits[cols].to_dict("records")
+
+            expires = now + self.ttl
+            for key, record, row_mask in zip(keys, records, masks[fired]):
+                key = key.item() if hasattr(key, "item") else key
+                record.update({
+                    "alert_key": key,
+                    "rules": ", ".join(names[row_mask]),
+                    "raised_at": now,
+                    "expires_at": expires,
+                })
+                self.active[key] = record
+                heapq.heappush(self._expiry, (expires, key))
+
+            return int(fired.sum())
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires, key = heapq.heappop(self._expiry)
+                alert = self.active.get(key)
+                # stale heap entry if the alert was refreshed since
+                if alert is not None and alert["expires_at"] == expires:
+                    del self.active[key]
+                    removed += 1
+        return removed
+
+    def sync(self, now=None):
+        # pull only the store parts appended since the last sync
+        with self._sync_lock:
+            version, new_parts = store.changed_parts(self.table, self.version)
+            if version != self.version:
+                if new_parts is None:
+                    with self._lock:
+                        self.active.clear()
+                        self._expiry.clear()
+                    self.ingest(store.read_table(self.table), now)
+                elif new_parts:
+                    self.ingest(store.read_table(self.table, parts=new_parts), now)
+                self.version = version
+        self.expire(now)
+        return self
+
+    def frame(self):
+        with self._lock:
+            return pd.DataFrame(list(self.active.values()))
+
+    def to_json(self):
+        with self._lock:
+            alerts = list(self.active.values())
+        return {
+            "count": len(alerts),
+            "evaluated": self.evaluated,
+            "alerts": json.loads(pd.DataFrame(alerts).to_json(orient="records"))
+            if alerts else [],
+        }
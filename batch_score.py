@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+
+import joblib
+import pandas as pd
+
+import instrumentation
+import registry
+from features import FEATURES, season
+from prediction_cache import CACHE, predict_proba
+
+CHUNK_SIZE = 50_000
+
+# ---------------------------------
+# READ
+# ---------------------------------
+def is_jsonl(path):
+    return path.endswith((".jsonl", ".json"))
+
+
+def read_chunks(path, chunksize=CHUNK_SIZE):
+    if is_jsonl(path):
+        return pd.read_json(path, lines=True, chunksize=chunksize)
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+# ---------------------------------
+# SCORE
+# ---------------------------------
+def score_chunk(model, chunk, version=None, cache=None):
+    # season is derived from month, everything else must be in the file
+    missing = [c for c in FEATURES if c != "season" and c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    chunk = chunk.copy()
+    chunk["season"] = season(chunk["month"])
+
+    # one vectorized pass through the forest, label derived from probabilities;
+    # with a cache, repeated rows (in this chunk or earlier ones) are not rescored
+    if cache is None:
+        with instrumentation.timer("model_predict_seconds"):
+            proba = model.predict_proba(chunk[FEATURES])
+    else:
+        proba = predict_proba(model, version, chunk, cache)
+    instrumentation.count("records_scored_total", len(chunk))
+    classes = model.classes_
+
+    chunk["predicted_severity"] = classes[proba.argmax(axis=1)]
+    for i, cls in enumerate(classes):
+        chunk[f"proba_{cls}"] = proba[:, i]
+
+    return chunk
+
+
+def iter_scored_chunks(path, model=None, chunksize=CHUNK_SIZE, version=None, cache=None):
+    if model is None:
+        version = registry.current_version("severity")
+        model = registry.load("severity", version)
+        version = version or "legacy"
+
+    for chunk in read_chunks(path, chunksize):
+        yield score_chunk(model, chunk, version, cache)
+
+
+# ---------------------------------
+# WRITE (streamed, one chunk at a time)
+# ---------------------------------
+def write_chunk(chunk, out, as_jsonl, first):
+    if as_jsonl:
+        chunk.to_json(out, orient="records", lines=True)
+    else:
+        chunk.to_csv(out, index=False, header=first)
+
+
+def score_file(input_path, output_path, model=None, chunksize=CHUNK_SIZE,
+               version=None, cache=None):
+    as_jsonl = is_jsonl(output_path)
+    out = sys.stdout if output_path == "-" else open(output_path, "w", newline="")
+
+    rows = 0
+    try:
+        for i, scored in enumerate(iter_scored_chunks(input_path, model, chunksize, version, cache)):
+            write_chunk(scored, out, as_jsonl, first=(i == 0))
+            rows += len(scored)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score incident files (CSV or JSONL) with the severity model."
+    )
+    parser.add_argument("input", help="CSV or JSONL file with incident rows")
+    parser.add_argument("output", help="CSV or JSONL output path ('-' for stdout CSV)")
+    parser.add_argument("--model", help="model pickle (default: current registered version)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse predictions for exact repeats; pays off only when "
+                             "the input repeats incidents")
+    args = parser.parse_args()
+
+    # cache namespace: the registry version, or the file and its mtime
+    if args.model:
+        model = joblib.load(args.model)
+        version = f"{args.model}@{os.path.getmtime(args.model)}"
+    else:
+        version = registry.current_version("severity")
+        model = registry.load("severity", version)
+        version = version or "legacy"
+    cache = CACHE if args.cache else None
+    rows = score_file(args.input, args.output, model, args.chunksize, version, cache)
+
+    print(f"✅ Scored {rows} rows → {args.output}", file=sys.stderr)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"✅ Cache: {stats['hits']:,} hits, {stats['misses']:,} scored", file=sys.stderr)
+    print(f"✅ Timings → {instrumentation.write_run_summary('batch_score')}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
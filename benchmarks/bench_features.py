@@ -0,0 +1,78 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import features
+
+ROWS = 10_000_000
+
+
+# the per-row versions features.py replaced
+def season_apply(m):
+    if m in [12, 1, 2]:
+        return "Winter"
+    if m in [3, 4, 5]:
+        return "Summer"
+    if m in [6, 7, 8, 9]:
+        return "Monsoon"
+    return "Post-Monsoon"
+
+
+def label_apply(score):
+    if score < 15:
+        return "Low"
+    elif score < 35:
+        return "Medium"
+    else:
+        return "High"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "month": rng.integers(1, 13, n),
+        "casualties": rng.integers(0, 41, n),
+        "economic_loss_crores": rng.uniform(0.1, 80, n).round(2),
+        "response_time_hours": rng.uniform(1, 24, n).round(1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Vectorized features.py vs the old per-row Series.apply."
+    )
+    parser.add_argument("--rows", type=int, default=ROWS)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    score = features.risk_score(df)
+
+    rows = []
+
+    apply_season, t_apply = timed(lambda: df["month"].apply(season_apply))
+    vec_season, t_vec = timed(lambda: features.season(df["month"]))
+    assert (vec_season.astype(object) == apply_season).all()
+    rows.append(("season", t_apply, t_vec))
+
+    apply_label, t_apply = timed(lambda: score.apply(label_apply))
+    vec_label, t_vec = timed(lambda: features.severity_from_score(score))
+    assert (vec_label.astype(object) == apply_label).all()
+    rows.append(("severity_from_score", t_apply, t_vec))
+
+    result = pd.DataFrame(rows, columns=["feature", "apply_s", "vectorized_s"])
+    result["speedup"] = result["apply_s"] / result["vectorized_s"]
+
+    print(f"✅ Identical outputs on {args.rows:,} rows")
+    print(result.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
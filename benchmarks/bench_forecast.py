@@ -0,0 +1,54 @@
+import argparse
+import time
+
+import numpy as np
+
+from forecasting import HoltWinters
+
+REGIONS = 5_000
+MONTHS = 132
+
+
+def make_series(regions, months, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    base = rng.uniform(4, 8, (regions, 1))
+    seasonal = rng.uniform(0, 3, (regions, 1)) * np.sin(2 * np.pi * t / 12)
+    return rng.poisson(base + seasonal + 0.01 * t).astype(float)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Holt-Winters fit/update time across many regions."
+    )
+    parser.add_argument("--regions", type=int, default=REGIONS)
+    parser.add_argument("--months", type=int, default=MONTHS)
+    args = parser.parse_args()
+
+    Y = make_series(args.regions, args.months)
+    regions = np.array([f"district_{i}" for i in range(args.regions)], dtype=object)
+    start = 2015 * 12
+
+    model = HoltWinters()
+    t0 = time.perf_counter()
+    model.fit(Y[:, :-1], regions, start)
+    fit_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _, status = model.refresh(Y, regions, start)
+    update_s = time.perf_counter() - t0
+    assert status == "updated"
+
+    t0 = time.perf_counter()
+    model.forecast(24)
+    forecast_s = time.perf_counter() - t0
+
+    print(f"✅ {args.regions:,} regions x {args.months} months, "
+          f"{len(model.grid)} parameter combos per region")
+    print(f"full fit:          {fit_s:8.3f}s")
+    print(f"one-month update:  {update_s:8.3f}s")
+    print(f"24-month forecast: {forecast_s:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import json
+import time
+
+from generate_data import generate_shard
+
+FEED_PATH = "incident_feed.jsonl"
+FIELDS = [
+    "incident_id", "state", "city", "disaster_type", "month", "year",
+    "casualties", "economic_loss_crores", "response_time_hours",
+]
+
+
+def produce(path, events, rate=None, chunk=1_000, seed=0, id_offset=0):
+    # appends synthetic incidents, one JSON object per line; with a rate,
+    # chunks are paced so the feed grows at about `rate` events/sec
+    start = time.perf_counter()
+    written = 0
+    with open(path, "a") as f:
+        for shard, offset in enumerate(range(0, events, chunk)):
+            n = min(chunk, events - offset)
+            df = generate_shard(n, seed, shard, id_offset + offset)[FIELDS]
+            text = df.to_json(orient="records", lines=True)
+            # whole lines only, so a reader never sees a record cut in two
+            f.write(text if text.endswith("\n") else text + "\n")
+            f.flush()
+            written += n
+            if rate:
+                ahead = written / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+    return written, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Append synthetic incidents to a JSONL feed for feed_consumer.py."
+    )
+    parser.add_argument("--out", default=FEED_PATH)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--rate", type=float, help="events/sec (default: as fast as possible)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--id-offset", type=int, default=0)
+    args = parser.parse_args()
+
+    written, elapsed = produce(args.out, args.events, args.rate, seed=args.seed,
+                               id_offset=args.id_offset)
+    print(json.dumps({"events": written, "wall_s": round(elapsed, 3),
+                      "events_per_s": round(written / max(elapsed, 1e-9), 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+import store
+
+URL = "http://127.0.0.1:8500/predict"
+DATA_TABLE = "final_dataset"
+
+FIELDS = [
+    "state", "city", "disaster_type", "month", "year",
+    "casualties", "economic_loss_crores", "response_time_hours",
+]
+
+
+def load_payloads(path=None, limit=1000):
+    # JSONL, one incident per line; falls back to rows of the final dataset
+    if path:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    df = store.read_table(DATA_TABLE, columns=FIELDS).head(limit)
+    return json.loads(df.to_json(orient="records"))
+
+
+def post(url, payload):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+def run(url, payloads, requests, concurrency):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                post(url, payloads[i % len(payloads)])
+                ok = True
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1e3
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 2) if len(lat_ms) else None,
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 2) if len(lat_ms) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay JSONL incident payloads against serve.py."
+    )
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--payloads", help="JSONL file, one incident per line")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads)
+    result = run(args.url, payloads, args.requests, args.concurrency)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import store
+from benchmarks import synthetic
+
+SIZES = [1_000, 10_000, 100_000]
+BATCH_SIZES = [1, 100]
+REPEAT = 3
+TRAIN_TREES = 100
+RESULTS_DIR = "benchmarks/results"
+REGRESSION_THRESHOLD = 0.20
+
+
+# ---------------------------------
+# CASES
+# ---------------------------------
+@dataclass
+class Case:
+    name: str
+    # setup(size, ctx) -> zero-argument callable that does the timed work
+    setup: object
+    repeat: int = REPEAT
+    extra_sizes: list = field(default_factory=list)
+
+
+def _table(size, ctx):
+    name = f"bench_{size}"
+    if name not in ctx:
+        store.write_table(name, synthetic.incidents(size))
+        ctx[name] = name
+    return name
+
+
+def _frame(size, ctx):
+    key = ("frame", size)
+    if key not in ctx:
+        ctx[key] = synthetic.incidents(size)
+    return ctx[key]
+
+
+def _model(ctx):
+    if "model" not in ctx:
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.pipeline import Pipeline
+
+        from compiled_model import export
+        from features import FEATURES
+        from model_selection import severity_preprocessor
+
+        train = synthetic.incidents(10_000, seed=1)
+        pipeline = Pipeline(steps=[
+            ("preprocess", severity_preprocessor()),
+            ("model", RandomForestClassifier(
+                n_estimators=TRAIN_TREES, class_weight="balanced", random_state=42)),
+        ]).fit(train[FEATURES], train["severity"])
+        ctx["model"] = pipeline
+        ctx["compiled"] = export(pipeline)
+    return ctx["model"], ctx["compiled"]
+
+
+def setup_load_data(size, ctx):
+    name = _table(size, ctx)
+    return lambda: store.read_table(name)
+
+
+def setup_cube_build(size, ctx):
+    from cube import COLUMNS, build_cube
+    df = _frame(size, ctx)[COLUMNS]
+    return lambda: build_cube(df)
+
+
+def setup_dashboard_rollups(size, ctx):
+    from cube import build_cube, members, rollup
+    cube = build_cube(_frame(size, ctx))
+
+    def run():
+        rollup(cube, "severity")
+        rollup(cube, "state")
+        rollup(cube, "disaster_type")
+        members(cube, "city", state="Gujarat")
+    return run
+
+
+def setup_map_layer(size, ctx):
+    from cube import build_cube, rollup
+    from gazetteer import geocode
+    from map_layers import bin_points
+    cube = build_cube(_frame(size, ctx))
+
+    def run():
+        points = rollup(cube, ["state", "city", "severity"], measures=("count", "casualties"))
+        coords = geocode(points["city"], points["state"])
+        points["lat"] = coords["latitude"].to_numpy()
+        points["lon"] = coords["longitude"].to_numpy()
+        bin_points(points, 6, weight="count")
+    return run
+
+
+def _batch(size, ctx):
+    from features import FEATURES
+    return _frame(max(size, 1_000), ctx).iloc[:size][FEATURES]
+
+
+def setup_predict(size, ctx):
+    model, _ = _model(ctx)
+    X = _batch(size, ctx)
+    return lambda: model.predict(X)
+
+
+def setup_predict_proba(size, ctx):
+    model, _ = _model(ctx)
+    X = _batch(size, ctx)
+    return lambda: model.predict_proba(X)
+
+
+def setup_compiled_predict_proba(size, ctx):
+    _, compiled = _model(ctx)
+    X = _batch(size, ctx)
+    return lambda: compiled.predict_proba(X)
+
+
+def setup_cached_predict_proba(size, ctx):
+    # warm cache: time_case's warm-up call scores the batch, timed calls hit
+    from prediction_cache import PredictionCache, predict_proba
+    model, _ = _model(ctx)
+    X = _batch(size, ctx)
+    cache = PredictionCache(maxsize=max(size, 1))
+    return lambda: predict_proba(model, "bench", X, cache)
+
+
+def setup_prepare_clean(size, ctx):
+    from prepare_final_dataset import clean
+    raw = synthetic.raw_incidents(size)
+    return lambda: clean(raw)
+
+
+def setup_emdat_clean(size, ctx):
+    from clean_emdat_data import cleaned_chunks
+    path = os.path.join(ctx["tmp"], f"emdat_{size}.csv")
+    synthetic.emdat_raw(size).to_csv(path, index=False)
+
+    def run():
+        for _ in cleaned_chunks(path, verbose=False):
+            pass
+    return run
+
+
+def setup_forecast_fit(size, ctx):
+    # one 11-year monthly series per 100 rows: 10 .. 1,000 regions
+    from benchmarks.bench_forecast import make_series
+    from forecasting import HoltWinters
+    regions = max(1, size // 100)
+    Y = make_series(regions, 132)
+    names = np.array([f"district_{i}" for i in range(regions)], dtype=object)
+    return lambda: HoltWinters().fit(Y, names, 2015 * 12)
+
+
+def setup_train(size, ctx):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+
+    from features import FEATURES
+    from model_selection import severity_preprocessor
+    df = _frame(size, ctx)
+
+    def run():
+        Pipeline(steps=[
+            ("preprocess", severity_preprocessor()),
+            ("model", RandomForestClassifier(
+                n_estimators=TRAIN_TREES, class_weight="balanced", random_state=42)),
+        ]).fit(df[FEATURES], df["severity"])
+    return run
+
+
+CASES = [
+    Case("load_data", setup_load_data),
+    Case("cube_build", setup_cube_build),
+    Case("dashboard_rollups", setup_dashboard_rollups),
+    Case("map_layer", setup_map_layer),
+    Case("predict", setup_predict, extra_sizes=BATCH_SIZES),
+    Case("predict_proba", setup_predict_proba, extra_sizes=BATCH_SIZES),
+    Case("compiled_predict_proba", setup_compiled_predict_proba, extra_sizes=BATCH_SIZES),
+    Case("cached_predict_proba", setup_cached_predict_proba, extra_sizes=BATCH_SIZES),
+    Case("prepare_clean", setup_prepare_clean),
+    Case("emdat_clean", setup_emdat_clean),
+    Case("forecast_fit", setup_forecast_fit, repeat=1),
+    Case("train", setup_train, repeat=1),
+]
+
+
+# ---------------------------------
+# RUN
+# ---------------------------------
+def time_case(fn, repeat):
+    fn()  # warm-up: imports, caches, lazy init
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run(sizes=SIZES, only=None, repeat=REPEAT):
+    results = []
+    saved_dir = store.DATA_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        # synthetic tables go to a scratch store, never into data/
+        store.DATA_DIR = os.path.join(tmp, "data")
+        ctx = {"tmp": tmp}
+        try:
+            for case in CASES:
+                if only and case.name not in only:
+                    continue
+                for size in sorted(set(case.extra_sizes) | set(sizes)):
+                    fn = case.setup(size, ctx)
+                    times = time_case(fn, min(repeat, case.repeat))
+                    best = min(times)
+                    results.append({
+                        "name": case.name,
+                        "size": size,
+                        "repeat": len(times),
+                        "min_s": best,
+                        "median_s": statistics.median(times),
+                        "rows_per_s": size / best if best > 0 else None,
+                    })
+                    print(f"  {case.name:<24} {size:>9,}  {best * 1000:>10.2f} ms",
+                          file=sys.stderr)
+        finally:
+            store.DATA_DIR = saved_dir
+    return results
+
+
+# ---------------------------------
+# COMPARE
+# ---------------------------------
+def compare(old, new, threshold=REGRESSION_THRESHOLD):
+    base = {(r["name"], r["size"]): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        before = base.get((r["name"], r["size"]))
+        if before is None:
+            continue
+        ratio = r["min_s"] / before["min_s"] if before["min_s"] > 0 else float("nan")
+        status = "regression" if ratio > 1 + threshold else (
+            "faster" if ratio < 1 - threshold else "")
+        rows.append({
+            "name": r["name"], "size": r["size"],
+            "old_ms": before["min_s"] * 1000, "new_ms": r["min_s"] * 1000,
+            "ratio": ratio, "status": status,
+        })
+    return pd.DataFrame(rows)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the hot paths at increasing synthetic data sizes."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", nargs="+", choices=[c.name for c in CASES])
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", help=f"results JSON (default: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two results files instead of running")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        table = compare(load(args.compare[0]), load(args.compare[1]), args.threshold)
+        print(table.round(3).to_string(index=False))
+        regressions = table[table["status"] == "regression"]
+        if len(regressions):
+            print(f"\n⚠️ {len(regressions)} regressions over {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+        return
+
+    env = environment()
+    print(f"Running benchmarks at sizes {args.sizes} (commit {env['commit']})", file=sys.stderr)
+    results = run(args.sizes, args.only, args.repeat)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{env['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"✅ {len(results)} results → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+import features
+from generate_data import generate_shard
+
+EMDAT_TYPES = ["Flood", "Storm", "Earthquake", "Drought", "Landslide", "Wildfire"]
+EMDAT_COUNTRIES = ["India", "Bangladesh", "Nepal", "Sri Lanka", "Pakistan"]
+
+
+def raw_incidents(n, seed=0):
+    """Rows shaped like risk_new.csv, from the generate_data.py generator."""
+    df = generate_shard(n, seed).drop(columns="risk_score")
+    return df.astype({c: str for c in ["state", "city", "disaster_type", "severity"]})
+
+
+def incidents(n, seed=0):
+    """Cleaned rows shaped like the final_dataset table (adds season, risk_score)."""
+    return features.add_features(raw_incidents(n, seed))
+
+
+def emdat_raw(n, seed=0):
+    """String columns shaped like an EM-DAT export, with some blanks."""
+    rng = np.random.default_rng(seed)
+
+    def maybe_blank(values, frac=0.1):
+        values = values.astype(str).astype(object)
+        values[rng.random(n) < frac] = ""
+        return values
+
+    return pd.DataFrame({
+        "Disaster Type": np.array(EMDAT_TYPES, dtype=object)[rng.integers(0, len(EMDAT_TYPES), n)],
+        "Disaster Subtype": "Unknown",
+        "Country": np.array(EMDAT_COUNTRIES, dtype=object)[rng.integers(0, len(EMDAT_COUNTRIES), n)],
+        "Region": "Southern Asia",
+        "Location": "Unknown",
+        "Start Year": maybe_blank(rng.integers(1990, 2025, n), 0.02),
+        "Start Month": maybe_blank(rng.integers(1, 13, n)),
+        "Total Deaths": maybe_blank(rng.integers(0, 500, n)),
+        "No. Injured": maybe_blank(rng.integers(0, 2000, n)),
+        "Total Affected": maybe_blank(rng.integers(0, 100_000, n)),
+        "Total Damage": maybe_blank(rng.integers(0, 50_000, n)),
+        "Magnitude": maybe_blank(rng.uniform(0, 9, n).round(1)),
+        "Latitude": maybe_blank(rng.uniform(6, 36, n).round(4), 0.3),
+        "Longitude": maybe_blank(rng.uniform(68, 97, n).round(4), 0.3),
+    })
@@ -1,38 +1,25 @@
+import time
+import warnings
+
 import pandas as pd
 import numpy as np
 
+import instrumentation
+import store
+from gazetteer import reverse_geocode
+from features import EMDAT_SEVERITY_THRESHOLDS, severity_from_score
+
 # ----------------------------------------------------
-# 1. LOAD RAW EM-DAT DATA (SAFE ENCODING)
+# 1. CONFIG
 # ----------------------------------------------------
 RAW_FILE = "emdat_raw.csv"
+OUT_TABLE = "emdat_processed"
 
-print(f"Loading raw data from: {RAW_FILE}")
-
-# ✅ FORCE safe decoding to avoid Unicode errors
-print(f"Loading raw data from: {RAW_FILE}")
-
-df = pd.read_csv(
-    RAW_FILE,
-    encoding="latin1",
-    engine="python",
-    on_bad_lines="skip"
-)
-
-print("✅ File loaded successfully!")
-print("Rows before cleaning:", len(df))
-
-
-print("✅ File loaded successfully!")
-print("Rows before cleaning:", len(df))
-
-print("\nColumns found in dataset:")
-for c in df.columns:
-    print("-", c)
-
-print("-" * 60)
+# rows per chunk; memory stays bounded by this, not by the size of the export
+CHUNK_SIZE = 100_000
 
 # ----------------------------------------------------
-# 2. SELECT RELEVANT COLUMNS
+# 2. RELEVANT COLUMNS
 # ----------------------------------------------------
 expected_cols = [
     "Disaster Type",
@@ -51,20 +38,7 @@ expected_cols = [
     "Longitude",
 ]
 
-available_cols = [c for c in expected_cols if c in df.columns]
-
-missing_cols = list(set(expected_cols) - set(available_cols))
-if missing_cols:
-    print("\n⚠️ Missing columns:")
-    for c in missing_cols:
-        print(" -", c)
-
-df = df[available_cols].copy()
-
-# ----------------------------------------------------
-# 3. RENAME COLUMNS
-# ----------------------------------------------------
-df = df.rename(columns={
+rename_map = {
     "Disaster Type": "disaster_type",
     "Disaster Subtype": "disaster_subtype",
     "Country": "country",
@@ -79,59 +53,16 @@ df = df.rename(columns={
     "Magnitude": "magnitude",
     "Latitude": "latitude",
     "Longitude": "longitude",
-})
+}
 
-# ----------------------------------------------------
-# 4. CLEAN DATA
-# ----------------------------------------------------
 num_cols = [
     "year", "month",
     "total_deaths", "injured", "affected",
     "damage", "magnitude", "latitude", "longitude"
 ]
 
-for col in num_cols:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
 text_cols = ["disaster_type", "disaster_subtype", "country", "region", "location"]
 
-for col in text_cols:
-    if col in df.columns:
-        df[col] = df[col].fillna("Unknown").astype(str)
-
-# Remove bad years
-if "year" in df.columns:
-    before = len(df)
-    df = df[df["year"] > 0]
-    print(f"\nRemoved {before - len(df)} rows with invalid year.")
-
-# ----------------------------------------------------
-# 5. CREATE REAL SEVERITY SCORE
-# ----------------------------------------------------
-df["severity_score"] = (
-    df.get("total_deaths", 0) * 0.4 +
-    df.get("affected", 0) * 0.3 +
-    df.get("damage", 0) * 0.2 +
-    df.get("magnitude", 0) * 0.1
-)
-
-# ----------------------------------------------------
-# 6. CREATE LABELS
-# ----------------------------------------------------
-def label_severity(score):
-    if score < 15:
-        return "Low"
-    elif score < 40:
-        return "Medium"
-    else:
-        return "High"
-
-df["severity"] = df["severity_score"].apply(label_severity)
-
-# ----------------------------------------------------
-# 7. FINAL DATASET
-# ----------------------------------------------------
 final_cols = [
     "disaster_type",
     "disaster_subtype",
@@ -147,22 +78,153 @@ final_cols = [
     "magnitude",
     "latitude",
     "longitude",
+    "nearest_city",
+    "nearest_state",
     "severity_score",
     "severity"
 ]
 
-df_final = df[final_cols].copy()
-
-# ----------------------------------------------------
-# 8. SAVE OUTPUT
-# ----------------------------------------------------
-OUT_FILE = "emdat_processed.csv"
-
-df_final.to_csv(OUT_FILE, index=False)
-
-print("\n✅ CLEAN DATASET CREATED")
-print("Saved as:", OUT_FILE)
-print("Final rows:", len(df_final))
+# EM-DAT points further than this from any gazetteer city stay unmatched
+NEAREST_CITY_MAX_KM = 150
+
+# ----------------------------------------------------
+# 3. CLEAN ONE CHUNK (fully vectorized)
+# ----------------------------------------------------
+def clean_chunk(df):
+    df = df.rename(columns=rename_map)
+
+    # columns missing from this export are filled so every chunk has one schema
+    for col in num_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float)
+        else:
+            df[col] = 0.0
+
+    for col in text_cols:
+        if col in df.columns:
+            df[col] = df[col].fillna("Unknown").astype(str)
+        else:
+            df[col] = "Unknown"
+
+    # Remove bad years
+    df = df[df["year"] > 0].copy()
+    df["year"] = df["year"].astype(int)
+    df["month"] = df["month"].astype(int)
+
+    df["severity_score"] = (
+        df["total_deaths"] * 0.4 +
+        df["affected"] * 0.3 +
+        df["damage"] * 0.2 +
+        df["magnitude"] * 0.1
+    )
+
+    # missing coordinates were filled with 0 above; treat them as unknown
+    has_coords = (df["latitude"] != 0) | (df["longitude"] != 0)
+    nearest = reverse_geocode(
+        df["latitude"].where(has_coords),
+        df["longitude"].where(has_coords),
+        max_km=NEAREST_CITY_MAX_KM,
+    )
+    df["nearest_city"] = nearest["city"].fillna("Unknown").to_numpy()
+    df["nearest_state"] = nearest["state"].fillna("Unknown").to_numpy()
+
+    # < 15 Low, < 40 Medium, otherwise High
+    df["severity"] = severity_from_score(
+        df["severity_score"], EMDAT_SEVERITY_THRESHOLDS
+    )
+
+    return df[final_cols]
+
+
+# ----------------------------------------------------
+# 4. STREAM RAW FILE → CLEAN PARTS
+# ----------------------------------------------------
+def read_header(path=RAW_FILE):
+    header = pd.read_csv(path, encoding="latin1", nrows=0)
+    return [c.strip() for c in header.columns]
+
+
+def cleaned_chunks(path=RAW_FILE, chunksize=CHUNK_SIZE, verbose=True, stats=None):
+    # counts for this pass only: ``stats`` (if given) is reset, then filled
+    # in as chunks are consumed
+    stats = {} if stats is None else stats
+    stats.update(read=0, kept=0, skipped_lines=0)
+    start = time.perf_counter()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+
+        reader = pd.read_csv(
+            path,
+            encoding="latin1",
+            engine="c",
+            # no usecols: the C parser only detects over-long rows when it
+            # parses every field
+            on_bad_lines="warn",
+            dtype=str,
+            chunksize=chunksize,
+        )
+
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            chunk = chunk[[c for c in expected_cols if c in chunk.columns]]
+
+            # the C parser reports bad lines as ParserWarnings
+            stats["skipped_lines"] += sum(
+                str(w.message).count("Skipping line") for w in caught
+            )
+            caught.clear()
+
+            with instrumentation.timer("emdat_clean_chunk_seconds"):
+                cleaned = clean_chunk(chunk)
+            instrumentation.count("emdat_rows_read_total", len(chunk))
+            stats["read"] += len(chunk)
+            stats["kept"] += len(cleaned)
+
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  {stats['read']:>10,} rows read | {stats['kept']:>10,} kept | "
+                    f"{stats['skipped_lines']:,} bad lines skipped | "
+                    f"{stats['read'] / elapsed:,.0f} rows/sec"
+                )
+            yield cleaned
+
+        stats["skipped_lines"] += sum(
+            str(w.message).count("Skipping line") for w in caught
+        )
+
+
+# ----------------------------------------------------
+# 5. RUN
+# ----------------------------------------------------
+def main():
+    print(f"Loading raw data from: {RAW_FILE}")
+
+    columns = read_header()
+    missing_cols = [c for c in expected_cols if c not in columns]
+    if missing_cols:
+        print("\n⚠️ Missing columns:")
+        for c in missing_cols:
+            print(" -", c)
+
+    print("-" * 60)
+
+    start = time.perf_counter()
+    stats = {}
+    store.write_parts(OUT_TABLE, cleaned_chunks(stats=stats))
+    elapsed = time.perf_counter() - start
+
+    # summary
+    print("\n✅ CLEAN DATASET CREATED")
+    print("Saved as:", store.table_dir(OUT_TABLE))
+    print("Rows read:", stats["read"])
+    print(f"Removed {stats['read'] - stats['kept']} rows with invalid year.")
+    print("Bad lines skipped:", stats["skipped_lines"])
+    print("Final rows:", stats["kept"])
+    print(f"Throughput: {stats['read'] / max(elapsed, 1e-9):,.0f} rows/sec")
+    print(f"Timings: {instrumentation.write_run_summary('clean_emdat_data')}")
+
 
-print("\nSample rows:")
-print(df_final.head())
+if __name__ == "__main__":
+    main()
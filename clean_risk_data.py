@@ -1,7 +1,9 @@
 import pandas as pd
 
+import store
+
 RAW_FILE = "risk_raw.csv"
-OUT_FILE = "risk_processed.csv"
+OUT_TABLE = "risk_processed"
 
 print("Loading dataset...")
 df = pd.read_csv(RAW_FILE)
@@ -70,8 +72,8 @@ df.dropna(inplace=True)
 # -----------------------------
 # Save cleaned dataset
 # -----------------------------
-df.to_csv(OUT_FILE, index=False)
+store.write_table(OUT_TABLE, df)
 
-print("✅ Processed dataset saved as:", OUT_FILE)
+print("✅ Processed dataset saved as:", store.table_dir(OUT_TABLE))
 print("Final rows:", len(df))
 print(df.head())
@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+import store
+
+MODEL_PATH = "models/severity_model.pkl"
+COMPILED_DIR = "models/severity_compiled"
+DATA_TABLE = "final_dataset"
+
+ARRAYS = ["feature", "threshold", "is_cat", "left", "right", "value", "roots"]
+
+# (tree, row) paths walked per block: big enough that numpy call overhead
+# is noise, small enough that the working arrays stay in cache
+BLOCK_PATHS = 1 << 18
+# finished paths loop on their leaf; the working set is compacted every few
+# levels rather than after every one
+COMPACT_EVERY = 3
+
+
+# ---------------------------------
+# ENGINE
+# ---------------------------------
+class CompiledForest:
+    """RandomForest + ColumnTransformer flattened into contiguous node arrays.
+
+    Every node of every tree lives in one set of arrays. Splits on one-hot
+    columns are rewritten as equality tests on integer category codes, so
+    raw categorical values never have to be expanded into one-hot matrices.
+    All trees advance one level per step over the whole batch.
+    """
+
+    def __init__(self, arrays, meta):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.is_cat = arrays["is_cat"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+
+        self.meta = meta
+        self.features = meta["features"]
+        self.categories = meta["categories"]
+        self.classes_ = np.array(meta["classes"], dtype=object)
+        self.max_depth = meta["max_depth"]
+
+        self._cat_index = {
+            name: pd.Index(cats) for name, cats in self.categories.items()
+        }
+
+        # traversal form: go left when x <= lo or x > hi. Numeric splits use
+        # (threshold, inf); a category test "code != c" uses (c - 0.5, c + 0.5).
+        # Inputs are float32, so thresholds are rounded down to float32
+        # without changing any comparison.
+        threshold = self.threshold.astype(np.float32)
+        above = threshold > self.threshold
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        self._feature = np.ascontiguousarray(self.feature, dtype=np.int32)
+        self._lo = np.where(self.is_cat, self.threshold - 0.5, threshold).astype(np.float32)
+        self._hi = np.where(self.is_cat, self.threshold + 0.5, np.inf).astype(np.float32)
+        self._children = np.stack([self.right, self.left], axis=1).ravel().astype(np.int32)
+        self._is_leaf = self.left == np.arange(len(self.left))
+        self._value_by_class = [
+            np.ascontiguousarray(self.value[:, k]) for k in range(self.value.shape[1])
+        ]
+        self._paths = self._leaf_row = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def block_rows(self):
+        return max(1, BLOCK_PATHS // self.n_trees)
+
+    def encode(self, df):
+        X = np.empty((len(df), len(self.features)), dtype=np.float32)
+        for j, name in enumerate(self.features):
+            if name in self._cat_index:
+                # unknown categories -> -1, i.e. the all-zero one-hot row
+                X[:, j] = self._cat_index[name].get_indexer(df[name])
+            else:
+                X[:, j] = df[name].to_numpy(dtype=np.float32)
+        return X
+
+    def _leaves(self, X):
+        n_rows, n_cols = X.shape
+        flat = np.ascontiguousarray(X, dtype=np.float32).ravel()
+
+        # one slot per (tree, row), every tree at once; only paths that have
+        # not hit a leaf yet stay in the working set
+        node = np.repeat(self.roots, n_rows).astype(np.int32)
+        leaves = node.copy()
+        pos = np.arange(len(node), dtype=np.int32)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int32) * n_cols, self.n_trees)
+
+        for depth in range(1, self.max_depth + 1):
+            x = flat.take(row_offset + self._feature.take(node))
+            go_left = x <= self._lo.take(node)
+            go_left |= x > self._hi.take(node)
+            node = self._children.take(2 * node + go_left)
+            if depth % COMPACT_EVERY and depth < self.max_depth:
+                continue
+
+            done = self._is_leaf.take(node)
+            leaves[pos.compress(done)] = node.compress(done)
+            keep = ~done
+            if not keep.any():
+                break
+            pos, node = pos.compress(keep), node.compress(keep)
+            row_offset = row_offset.compress(keep)
+
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba_encoded(self, X):
+        # repeated incidents are walked once
+        X, inverse = unique_rows(X)
+        proba = np.empty((len(X), len(self.classes_)))
+        step = self.block_rows
+        for start in range(0, len(X), step):
+            leaves = self._leaves(X[start:start + step])
+            # reducing over the tree axis adds trees in order, like sklearn
+            proba[start:start + step] = np.stack(
+                [v.take(leaves).sum(axis=0) for v in self._value_by_class], axis=1
+            )
+        proba /= self.n_trees
+        return proba[inverse]
+
+    def _path_contributions(self):
+        # per leaf: what the path from its root credits to each (feature,
+        # class), one contiguous column per pair; built on first use. Only
+        # leaves are gathered, so internal nodes get no rows. Kept float64:
+        # float32 sums break bias + contrib == proba and can flip tied votes
+        if self._paths is None:
+            n_feat, n_cls = len(self.features), len(self.classes_)
+            leaf_ids = np.flatnonzero(self._is_leaf)
+            self._leaf_row = np.zeros(len(self.feature), dtype=np.int32)
+            self._leaf_row[leaf_ids] = np.arange(len(leaf_ids))
+            paths = np.empty((len(leaf_ids), n_feat, n_cls))
+
+            # walk down level by level, carrying the sums of the open paths
+            node = self.roots
+            acc = np.zeros((len(node), n_feat, n_cls))
+            while len(node):
+                leaf = self._is_leaf[node]
+                paths[self._leaf_row[node[leaf]]] = acc[leaf]
+                node, acc = node[~leaf], acc[~leaf]
+                split = (np.arange(len(node)), self.feature[node])
+                children, sums = [], []
+                for child in (self.left[node], self.right[node]):
+                    step = acc.copy()
+                    step[split] += self.value[child] - self.value[node]
+                    children.append(child)
+                    sums.append(step)
+                node, acc = np.concatenate(children), np.concatenate(sums)
+            self._paths = [np.ascontiguousarray(c) for c in paths.reshape(len(paths), -1).T]
+        return self._paths
+
+    def contributions_encoded(self, X):
+        """Tree-path decomposition of predict_proba.
+
+        Every split moves a row from a node to a child; the change in class
+        distribution is credited to the split's source feature (one-hot
+        columns are already folded back into their field). Returns ``bias``
+        (classes,) and ``contrib`` (rows, features, classes) with
+        ``bias + contrib.sum(axis=1) == predict_proba``.
+
+        Each leaf's path sums are precomputed, so this is the prediction
+        traversal plus one gather per (feature, class) instead of one per
+        class.
+        """
+        n_feat, n_cls = len(self.features), len(self.classes_)
+        bias = self.value[self.roots].mean(axis=0)
+        columns = self._path_contributions()
+
+        X, inverse = unique_rows(X)
+        contrib = np.empty((len(X), n_feat * n_cls))
+        step = self.block_rows
+        for start in range(0, len(X), step):
+            rows = self._leaf_row.take(self._leaves(X[start:start + step]))
+            contrib[start:start + step] = np.stack(
+                [c.take(rows).sum(axis=0) for c in columns], axis=1
+            )
+        contrib /= self.n_trees
+        return bias, contrib.reshape(len(X), n_feat, n_cls)[inverse]
+
+    def predict_with_proba(self, df):
+        proba = self.predict_proba_encoded(self.encode(df))
+        return self.classes_[proba.argmax(axis=1)], proba
+
+    def predict_proba(self, df):
+        return self.predict_with_proba(df)[1]
+
+    def predict(self, df):
+        return self.predict_with_proba(df)[0]
+
+    # ---------------------------------
+    # PERSISTENCE (.npy per array so they can be memory-mapped)
+    # ---------------------------------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+
+def unique_rows(X):
+    """Distinct rows of an encoded batch, and each input row's index into them."""
+    if len(X) < 2:
+        return X, np.arange(len(X))
+    X = np.ascontiguousarray(X)
+    rows = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return X[first], inverse.ravel()
+
+
+# ---------------------------------
+# EXPORT
+# ---------------------------------
+def _output_columns(preprocess):
+    # one (source feature, category or None) entry per transformed column
+    columns = []
+    for name, trans, cols in preprocess.transformers_:
+        if trans == "drop" or len(cols) == 0:
+            continue
+        # fitted "passthrough" columns show up as an identity FunctionTransformer
+        if trans == "passthrough" or (
+            isinstance(trans, FunctionTransformer) and trans.func is None
+        ):
+            columns += [(c, None) for c in cols]
+        elif isinstance(trans, OneHotEncoder):
+            if trans.drop_idx_ is not None:
+                raise ValueError("OneHotEncoder with drop= is not supported")
+            for c, cats in zip(cols, trans.categories_):
+                columns += [(c, cat) for cat in cats]
+        else:
+            raise ValueError(f"Unsupported transformer in '{name}': {trans!r}")
+    return columns
+
+
+def export(pipeline):
+    preprocess = pipeline.named_steps["preprocess"]
+    rf = pipeline.named_steps["model"]
+
+    out_cols = _output_columns(preprocess)
+
+    features = []
+    for src, _ in out_cols:
+        if src not in features:
+            features.append(src)
+    feature_pos = {name: j for j, name in enumerate(features)}
+
+    categories = {}
+    for src, cat in out_cols:
+        if cat is not None:
+            categories.setdefault(src, []).append(cat)
+    cat_code = {
+        src: {cat: k for k, cat in enumerate(cats)}
+        for src, cats in categories.items()
+    }
+
+    feature, threshold, is_cat, left, right, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for est in rf.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        leaf = tree.children_left == -1
+
+        f = np.zeros(n, dtype=np.int32)
+        thr = np.zeros(n, dtype=np.float64)
+        cat = np.zeros(n, dtype=bool)
+
+        for i in np.flatnonzero(~leaf):
+            src, category = out_cols[tree.feature[i]]
+            f[i] = feature_pos[src]
+            if category is None:
+                thr[i] = tree.threshold[i]
+            else:
+                if not 0 <= tree.threshold[i] < 1:
+                    raise ValueError("Unexpected threshold on a one-hot column")
+                cat[i] = True
+                thr[i] = cat_code[src][category]
+
+        idx = np.arange(n, dtype=np.int32)
+        left.append(np.where(leaf, idx, tree.children_left) + offset)
+        right.append(np.where(leaf, idx, tree.children_right) + offset)
+
+        v = tree.value[:, 0, :].astype(np.float64)
+        norm = v.sum(axis=1, keepdims=True)
+        norm[norm == 0.0] = 1.0
+        value.append(v / norm)
+
+        feature.append(f)
+        threshold.append(thr)
+        is_cat.append(cat)
+        roots.append(offset)
+
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        "feature": np.ascontiguousarray(np.concatenate(feature)),
+        "threshold": np.ascontiguousarray(np.concatenate(threshold)),
+        "is_cat": np.ascontiguousarray(np.concatenate(is_cat)),
+        "left": np.ascontiguousarray(np.concatenate(left).astype(np.int32)),
+        "right": np.ascontiguousarray(np.concatenate(right).astype(np.int32)),
+        "value": np.ascontiguousarray(np.concatenate(value)),
+        "roots": np.array(roots, dtype=np.int32),
+    }
+    meta = {
+        "features": features,
+        "categories": {
+            src: [c.item() if hasattr(c, "item") else c for c in cats]
+            for src, cats in categories.items()
+        },
+        "classes": [c.item() if hasattr(c, "item") else c for c in rf.classes_],
+        "max_depth": int(max_depth),
+    }
+    return CompiledForest(arrays, meta)
+
+
+# ---------------------------------
+# PARITY CHECK
+# ---------------------------------
+def check_parity(pipeline, compiled, X):
+    expected_proba = pipeline.predict_proba(X)
+    expected_label = pipeline.classes_[expected_proba.argmax(axis=1)]
+
+    label, proba = compiled.predict_with_proba(X)
+
+    label_match = float((label == expected_label).mean())
+    max_diff = float(np.abs(proba - expected_proba).max())
+
+    if label_match != 1.0 or not np.allclose(proba, expected_proba):
+        raise AssertionError(
+            f"Compiled model diverges: label match {label_match:.4f}, "
+            f"max proba diff {max_diff:.2e}"
+        )
+    return label_match, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the severity pipeline into a compiled array model."
+    )
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--out", default=COMPILED_DIR)
+    parser.add_argument("--data", default=DATA_TABLE, help="dataset store table")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)
+    compiled = export(pipeline)
+    compiled.save(args.out)
+
+    print(f"✅ Compiled {compiled.n_trees} trees, {len(compiled.feature)} nodes "
+          f"(max depth {compiled.max_depth}) → {args.out}")
+
+    df = store.read_table(args.data)
+    label_match, max_diff = check_parity(pipeline, CompiledForest.load(args.out), df)
+    print(f"✅ Parity on {len(df)} rows: labels {label_match:.2%}, "
+          f"max proba diff {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import threading
+
+import pandas as pd
+
+import store
+
+DIMENSIONS = ["state", "city", "disaster_type", "year", "month", "severity"]
+MEASURES = ["casualties", "economic_loss_crores"]
+COLUMNS = DIMENSIONS + MEASURES
+
+
+# ---------------------------------
+# BUILD / MERGE
+# ---------------------------------
+def build_cube(df):
+    cube = (
+        df.groupby(DIMENSIONS, observed=True)
+        .agg(
+            count=("severity", "size"),
+            casualties=("casualties", "sum"),
+            economic_loss_crores=("economic_loss_crores", "sum"),
+        )
+        .reset_index()
+    )
+    return _normalize(cube)
+
+
+def merge_cubes(cube, delta):
+    if cube is None or cube.empty:
+        return delta
+    merged = (
+        # categories differ between parts; concat plain, re-encode after
+        pd.concat([store.plain(cube), store.plain(delta)], ignore_index=True)
+        .groupby(DIMENSIONS, observed=True)[["count"] + MEASURES]
+        .sum()
+        .reset_index()
+    )
+    return _normalize(merged)
+
+
+def update_cube(cube, new_rows):
+    return merge_cubes(cube, build_cube(new_rows))
+
+
+def _normalize(cube):
+    for d in ["state", "city", "disaster_type", "severity"]:
+        cube[d] = cube[d].astype(str).astype("category")
+    cube["count"] = cube["count"].astype("int64")
+    return cube
+
+
+# ---------------------------------
+# QUERY
+# ---------------------------------
+def rollup(cube, by, measures=("count",), **filters):
+    # sum measures over every dimension not in `by`, after equality filters
+    for dim, value in filters.items():
+        cube = cube[cube[dim] == value]
+    return (
+        cube.groupby(by, observed=True)[list(measures)]
+        .sum()
+        .reset_index()
+    )
+
+
+def members(cube, dim, **filters):
+    for d, value in filters.items():
+        cube = cube[cube[d] == value]
+    return sorted(cube[dim].unique())
+
+
+# ---------------------------------
+# INCREMENTAL MAINTENANCE
+# ---------------------------------
+class IncrementalCube:
+    """Keeps a cube in sync with a store table.
+
+    Parts appended since the last refresh are read and merged in. If earlier
+    parts were rewritten, the cube is rebuilt from scratch.
+    """
+
+    def __init__(self, table="final_dataset"):
+        self.table = table
+        self.cube = None
+        self.version = None
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            if store.table_version(self.table) == self.version:
+                return self.cube
+
+            since = self.version if self.cube is not None else None
+            version, new_parts = store.changed_parts(self.table, since)
+
+            if new_parts is not None:
+                delta = store.read_table(self.table, columns=COLUMNS, parts=new_parts)
+                self.cube = update_cube(self.cube, delta)
+                self.rows += len(delta)
+            else:
+                df = store.read_table(self.table, columns=COLUMNS)
+                self.cube = build_cube(df)
+                self.rows = len(df)
+
+            self.version = version
+            return self.cube
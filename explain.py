@@ -0,0 +1,128 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import registry
+from prediction_cache import PredictionCache, cached_rows, normalize
+
+EXPLAIN_CACHE_ENTRIES = 10_000
+TOP = 3
+
+_compiled = {}
+
+
+# ---------------------------------
+# MODEL
+# ---------------------------------
+def compiled_model(version=None):
+    """Compiled arrays of a severity version, loaded once per version."""
+    version = version or registry.current_version("severity")
+    key = version or "legacy"
+    if key not in _compiled:
+        _compiled[key] = registry.load("severity", version, part="compiled")
+    return key, _compiled[key]
+
+
+# ---------------------------------
+# EXPLAIN
+# ---------------------------------
+class Explanation:
+    """``bias + contributions.sum(axis=1) == proba`` for every row."""
+
+    def __init__(self, features, classes, values, bias, contributions, version):
+        self.features = list(features)
+        self.classes = [str(c) for c in classes]
+        self.values = values
+        self.bias = bias
+        self.contributions = contributions
+        self.version = version
+
+    @property
+    def proba(self):
+        return self.bias + self.contributions.sum(axis=1)
+
+    def predicted(self):
+        return np.array(self.classes, dtype=object)[self.proba.argmax(axis=1)]
+
+    def frame(self, row=0, cls=None):
+        """Per-field contributions to P(``cls``) for one row, largest first.
+
+        ``cls`` defaults to the predicted class.
+        """
+        c = self.proba[row].argmax() if cls is None else self.classes.index(cls)
+        df = pd.DataFrame({
+            "feature": self.features,
+            "value": self.values.iloc[row][self.features].to_numpy(),
+            "contribution": self.contributions[row, :, c],
+        })
+        order = np.argsort(-np.abs(df["contribution"].to_numpy()), kind="stable")
+        return df.iloc[order].reset_index(drop=True)
+
+    def top(self, n=TOP):
+        # (row, predicted class) -> the n fields that pushed it up the most
+        c = self.proba.argmax(axis=1)
+        picked = self.contributions[np.arange(len(c)), :, c]
+        order = np.argsort(-picked, axis=1)[:, :n]
+        names = np.array(self.features, dtype=object)
+        return pd.DataFrame({
+            f"reason_{i + 1}": names[order[:, i]] for i in range(order.shape[1])
+        })
+
+
+EXPLAIN_CACHE = PredictionCache(maxsize=EXPLAIN_CACHE_ENTRIES)
+
+
+def explain(df, version=None, cache=EXPLAIN_CACHE):
+    """Tree-path contributions for every row of ``df``.
+
+    Rows are normalized and deduplicated like predictions; contributions
+    already computed for this model version come from ``cache``.
+    """
+    version, compiled = compiled_model(version)
+    X = normalize(df)
+    contributions = cached_rows(
+        cache, version, X,
+        lambda rows: compiled.contributions_encoded(compiled.encode(rows))[1],
+    )
+
+    bias = compiled.value[compiled.roots].mean(axis=0)
+    return Explanation(compiled.features, compiled.classes_, X.reset_index(drop=True),
+                       bias, contributions, version)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Explain severity predictions as per-field contributions."
+    )
+    parser.add_argument("input", help="CSV or JSONL file with incident rows")
+    parser.add_argument("output", help="CSV with predictions, top reasons and contributions "
+                                       "to the predicted class ('-' for stdout)")
+    parser.add_argument("--version", help="model version (default: current)")
+    parser.add_argument("--top", type=int, default=TOP)
+    args = parser.parse_args()
+
+    if args.input.endswith((".jsonl", ".json")):
+        df = pd.read_json(args.input, lines=True)
+    else:
+        df = pd.read_csv(args.input)
+
+    result = explain(df, args.version)
+    proba = result.proba
+    picked = result.contributions[np.arange(len(df)), :, proba.argmax(axis=1)]
+
+    out = df.reset_index(drop=True)
+    out["predicted_severity"] = result.predicted()
+    out["probability"] = proba.max(axis=1)
+    out = pd.concat([out, result.top(args.top)], axis=1)
+    for j, name in enumerate(result.features):
+        out[f"contrib_{name}"] = picked[:, j]
+
+    out.to_csv(sys.stdout if args.output == "-" else args.output, index=False)
+    print(f"✅ Explained {len(out)} rows with severity {result.version} → {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------
+# MODEL FEATURES
+# ---------------------------------
+CAT_FEATURES = ["state", "city", "disaster_type", "season"]
+NUM_FEATURES = [
+    "month", "year",
+    "casualties",
+    "economic_loss_crores",
+    "response_time_hours"
+]
+FEATURES = CAT_FEATURES + NUM_FEATURES
+
+# WorldRiskIndex model (train_risk_model.py / score_risk.py)
+RISK_FEATURES = [
+    "wri",
+    "exposure",
+    "vulnerability",
+    "susceptibility",
+    "coping",
+    "adaptive",
+    "year"
+]
+
+# ---------------------------------
+# SEASON
+# ---------------------------------
+SEASONS = ["Winter", "Summer", "Monsoon", "Post-Monsoon"]
+
+# month -> season code. Index 0 and 13 catch months outside 1-12 (after
+# clipping), which fall through to Post-Monsoon like the old if/elif chain
+SEASON_CODE_BY_MONTH = np.array([
+    3,
+    0, 0,           # Jan, Feb
+    1, 1, 1,        # Mar - May
+    2, 2, 2, 2,     # Jun - Sep
+    3, 3,           # Oct, Nov
+    0,              # Dec
+    3,
+], dtype=np.int8)
+
+
+def season(month):
+    # works on a scalar month (returns a str) or a whole column (returns a
+    # categorical Series / Categorical) with a single array lookup
+    m = np.asarray(month)
+    if m.dtype.kind == "f":
+        m = np.nan_to_num(m, nan=0.0)
+    idx = np.clip(m, 0, 13).astype(np.intp, copy=False)
+    codes = SEASON_CODE_BY_MONTH[idx]
+
+    if codes.ndim == 0:
+        return SEASONS[codes]
+
+    values = pd.Categorical.from_codes(codes, categories=SEASONS, validate=False)
+    if isinstance(month, pd.Series):
+        return pd.Series(values, index=month.index, name="season")
+    return values
+
+
+# ---------------------------------
+# RISK SCORE / SEVERITY
+# ---------------------------------
+SEVERITY_LABELS = ["Low", "Medium", "High"]
+
+# score < t0 -> Low, score < t1 -> Medium, otherwise High
+INCIDENT_SEVERITY_THRESHOLDS = (15, 35)
+EMDAT_SEVERITY_THRESHOLDS = (15, 40)
+
+
+def risk_score(df):
+    return (
+        df["casualties"] * 0.4
+        + df["economic_loss_crores"] * 0.4
+        + (24 - df["response_time_hours"]) * 0.2
+    )
+
+
+def severity_from_score(score, thresholds=INCIDENT_SEVERITY_THRESHOLDS):
+    # one comparison per threshold; "not below" keeps NaN scores in High, as
+    # the old if/elif chain did
+    s = np.asarray(score)
+    codes = np.zeros(s.shape, dtype=np.int8)
+    for t in thresholds:
+        codes += ~(s < t)
+
+    if codes.ndim == 0:
+        return SEVERITY_LABELS[codes]
+
+    labels = pd.Categorical.from_codes(codes, categories=SEVERITY_LABELS, validate=False)
+    if isinstance(score, pd.Series):
+        return pd.Series(labels, index=score.index)
+    return labels
+
+
+def add_features(df):
+    df = df.copy()
+    df["season"] = season(df["month"])
+    df["risk_score"] = risk_score(df)
+    return df
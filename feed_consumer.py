@@ -0,0 +1,314 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import store
+from ingest import DTYPES
+from prediction_cache import predict_proba
+from prepare_final_dataset import NUM_COLS, clean
+from registry import LazyModel
+from serve import validate
+
+FEED_PATH = "incident_feed.jsonl"
+OUT_TABLE = "scored_incidents"
+BATCH_LINES = 1_000
+BATCH_WAIT_S = 0.5
+QUEUE_BATCHES = 8
+# scored micro-batches are buffered into store parts of up to FLUSH_ROWS rows,
+# or whatever arrived within FLUSH_S, so a quiet feed does not leave one tiny
+# part per micro-batch
+FLUSH_ROWS = 50_000
+FLUSH_S = 5.0
+POLL_S = 0.2
+REPORT_EVERY_S = 10.0
+
+REQUIRED = ["state", "city", "disaster_type"] + NUM_COLS
+_STOP = object()
+
+
+# ---------------------------------
+# CHECKPOINT
+# ---------------------------------
+# {"offset": byte offset of the next unread line, "version": table version
+# right after the last append}. Appends happen before the checkpoint is
+# saved; every scored row carries its batch's end offset, so a crash in
+# between is recovered from the table itself, never by scoring twice.
+def checkpoint_path(table):
+    return os.path.join(store.DATA_DIR, f"{table}.feed.json")
+
+
+def load_checkpoint(table):
+    path = checkpoint_path(table)
+    if not os.path.exists(path):
+        return {"offset": 0, "version": None}
+    with open(path) as f:
+        state = json.load(f)
+    if state["version"] and isinstance(state["version"][0], list):
+        state["version"] = tuple(tuple(v) for v in state["version"])
+    return state
+
+
+def save_checkpoint(table, offset, version):
+    path = checkpoint_path(table)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"offset": offset, "version": version}, f)
+    os.replace(tmp, path)
+
+
+def resume_offset(table):
+    state = load_checkpoint(table)
+    offset = state["offset"]
+    if not store.list_parts(table):
+        return offset
+
+    _, parts = store.changed_parts(table, state["version"])
+    if parts is None and state["version"] is not None:
+        # the table was rewritten: trust what it says it has consumed
+        parts = store.list_parts(table)
+    if parts:
+        done = store.read_table(table, columns=["feed_offset"], parts=parts)
+        if len(done):
+            offset = max(offset, int(done["feed_offset"].max()))
+    return offset
+
+
+# ---------------------------------
+# READER (tails the file, blocks when the queue is full)
+# ---------------------------------
+class Tail(threading.Thread):
+    """Reads complete lines from ``offset`` on and queues them in batches.
+
+    ``queue.put`` blocks while the worker is behind, so the reader stops
+    reading and memory stays bounded by ``QUEUE_BATCHES`` batches.
+    """
+
+    def __init__(self, path, offset, out, batch_lines=BATCH_LINES,
+                 batch_wait=BATCH_WAIT_S, follow=True):
+        super().__init__(daemon=True)
+        self.path = path
+        self.offset = offset
+        self.out = out
+        self.batch_lines = batch_lines
+        self.batch_wait = batch_wait
+        self.follow = follow
+        self.stop = threading.Event()
+
+    def _wait_for_file(self):
+        while not os.path.exists(self.path):
+            if not self.follow or self.stop.wait(POLL_S):
+                return None
+        f = open(self.path, "rb")
+        if os.fstat(f.fileno()).st_size < self.offset:
+            # truncated or replaced: the old offset means nothing now
+            print(f"⚠️ {self.path} shrank below offset {self.offset}; starting over")
+            self.offset = 0
+        f.seek(self.offset)
+        return f
+
+    def run(self):
+        f = self._wait_for_file()
+        if f is None:
+            self.out.put(_STOP)
+            return
+
+        lines = []
+        deadline = None
+        with f:
+            while not self.stop.is_set():
+                line = f.readline()
+                if line.endswith(b"\n"):
+                    self.offset += len(line)
+                    if line.strip():
+                        lines.append(line)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.batch_wait
+                    if len(lines) < self.batch_lines:
+                        continue
+                else:
+                    # EOF, or a line still being written: re-read it later
+                    f.seek(self.offset)
+                    if not self.follow:
+                        if lines:
+                            self.out.put((self.offset, lines))
+                        break
+                    # a partial batch goes out once it has waited batch_wait
+                    remaining = (deadline or 0) - time.monotonic()
+                    if not lines or remaining > 0:
+                        self.stop.wait(min(POLL_S, max(remaining, 0.01)))
+                        continue
+
+                self.out.put((self.offset, lines))
+                lines = []
+                deadline = None
+
+        self.out.put(_STOP)
+
+
+# ---------------------------------
+# WORKER
+# ---------------------------------
+def parse(lines):
+    # type checks as for /predict: a record clean() would coerce, or that
+    # would fail the append (e.g. "state": 7), is rejected here on its own
+    records, bad = [], 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("not a JSON object")
+            valid = validate(record)[0]
+        except ValueError:
+            bad += 1
+            continue
+        valid["incident_id"] = record.get("incident_id")
+        records.append(valid)
+    return pd.DataFrame.from_records(records, columns=REQUIRED + ["incident_id"]), bad
+
+
+def score_batch(lines, end_offset, model):
+    df, bad = parse(lines)
+
+    # same validation and feature engineering as the offline dataset; exact
+    # repeats within the batch are dropped with the invalid rows
+    valid = clean(df[REQUIRED]).astype({c: DTYPES[c] for c in NUM_COLS})
+    rejected = bad + len(df) - len(valid)
+    if valid.empty:
+        return valid, rejected
+
+    # incident_id is optional in the feed; nullable so every part has one schema
+    valid.insert(0, "incident_id",
+                 pd.to_numeric(df["incident_id"], errors="coerce")
+                 .reindex(valid.index).astype("Int64"))
+
+    lazy_model = model.get()
+    proba = predict_proba(lazy_model, model.version, valid)
+    classes = [str(c) for c in lazy_model.classes_]
+
+    valid = valid.assign(
+        predicted_severity=np.array(classes, dtype=object)[proba.argmax(axis=1)],
+        **{f"proba_{c}": proba[:, i] for i, c in enumerate(classes)},
+        model_version=model.version,
+        feed_offset=np.int64(end_offset),
+        scored_at=time.time(),
+    )
+    return valid, rejected
+
+
+class Rate:
+    def __init__(self):
+        self.start = self.last = time.monotonic()
+        self.total = self.window = 0
+
+    def add(self, n):
+        self.total += n
+        self.window += n
+
+    def report(self, backlog, force=False):
+        now = time.monotonic()
+        if not force and now - self.last < REPORT_EVERY_S:
+            return
+        window_rate = self.window / max(now - self.last, 1e-9)
+        sustained = self.total / max(now - self.start, 1e-9)
+        print(f"  {self.total:>10,} events | {window_rate:>9,.0f}/s now | "
+              f"{sustained:>9,.0f}/s sustained | {backlog} batches queued")
+        self.last, self.window = now, 0
+
+
+def consume(path=FEED_PATH, table=OUT_TABLE, batch_lines=BATCH_LINES,
+            queue_batches=QUEUE_BATCHES, follow=True, model=None):
+    model = model or LazyModel("severity")
+    offset = resume_offset(table)
+    batches = queue.Queue(maxsize=queue_batches)
+    reader = Tail(path, offset, batches, batch_lines, follow=follow)
+    rate = Rate()
+    print(f"✅ Consuming {path} from byte {offset:,} → {store.table_dir(table)}/")
+
+    reader.start()
+    stats = {"events": 0, "scored": 0, "rejected": 0, "offset": offset}
+    pending, pending_offset = [], offset
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal pending, last_flush
+        with instrumentation.timer("feed_flush_seconds"):
+            frames = [df for df in pending if len(df)]
+            if frames:
+                store.append_table(table, pd.concat(frames, ignore_index=True))
+            # only now are the buffered offsets safe to skip on restart
+            save_checkpoint(table, pending_offset, store.table_version(table))
+        stats["offset"] = pending_offset
+        pending, last_flush = [], time.monotonic()
+
+    try:
+        while True:
+            try:
+                item = batches.get(timeout=FLUSH_S)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                break
+            if item is not None:
+                end_offset, lines = item
+                instrumentation.observe("feed_queue_depth", batches.qsize(),
+                                        instrumentation.SIZE_BUCKETS)
+                with instrumentation.timer("feed_batch_seconds"):
+                    scored, rejected = score_batch(lines, end_offset, model)
+                pending.append(scored)
+                pending_offset = end_offset
+
+                stats["events"] += len(lines)
+                stats["scored"] += len(scored)
+                stats["rejected"] += rejected
+                instrumentation.count("feed_events_total", len(lines))
+                instrumentation.count("feed_rejected_total", rejected)
+                rate.add(len(lines))
+
+            buffered = sum(len(df) for df in pending)
+            if pending and (buffered >= FLUSH_ROWS or time.monotonic() - last_flush >= FLUSH_S):
+                flush()
+            rate.report(batches.qsize())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.stop.set()
+        if pending:
+            flush()
+        rate.report(batches.qsize(), force=True)
+
+    stats["elapsed_s"] = time.monotonic() - rate.start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tail a JSONL incident feed, score it in micro-batches and append to the store."
+    )
+    parser.add_argument("feed", nargs="?", default=FEED_PATH)
+    parser.add_argument("--table", default=OUT_TABLE)
+    parser.add_argument("--batch-lines", type=int, default=BATCH_LINES)
+    parser.add_argument("--queue-batches", type=int, default=QUEUE_BATCHES,
+                        help="batches read ahead before the reader blocks")
+    parser.add_argument("--once", action="store_true",
+                        help="stop at end of file instead of waiting for more lines")
+    args = parser.parse_args()
+
+    stats = consume(args.feed, args.table, args.batch_lines, args.queue_batches,
+                    follow=not args.once)
+    print(f"✅ {stats['events']:,} events ({stats['scored']:,} scored, "
+          f"{stats['rejected']:,} rejected) in {stats['elapsed_s']:.1f}s; "
+          f"checkpoint at byte {stats['offset']:,}")
+    print(f"✅ Timings → {instrumentation.write_run_summary('feed_consumer')}")
+
+
+if __name__ == "__main__":
+    main()
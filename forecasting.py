@@ -0,0 +1,205 @@
+import hashlib
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+FORECAST_DIR = "models/forecast"
+
+# smoothing-parameter grid searched for every region at once
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7)
+BETAS = (0.0, 0.01, 0.05, 0.1, 0.2)
+GAMMAS = (0.05, 0.1, 0.2, 0.4)
+
+
+# ---------------------------------
+# SERIES
+# ---------------------------------
+def monthly_counts(df, region, year="year", month="month"):
+    """Dense region x year-month matrix of incident counts.
+
+    Months with no incidents are real zeros, so the grid runs from the
+    first to the last month seen anywhere in ``df``.
+    """
+    period = df[year].to_numpy(dtype=np.int64) * 12 + df[month].to_numpy(dtype=np.int64) - 1
+    codes, regions = pd.factorize(df[region].astype(str), sort=True)
+    start = int(period.min())
+    width = int(period.max()) - start + 1
+
+    Y = np.zeros((len(regions), width))
+    np.add.at(Y, (codes, period - start), 1)
+    return Y, np.asarray(regions, dtype=object), start
+
+
+def annual_values(df, region, value, year="year"):
+    """Dense region x year matrix of ``value``; missing years stay NaN."""
+    wide = df.pivot_table(index=region, columns=year, values=value,
+                          aggfunc="mean", observed=True)
+    years = np.arange(int(wide.columns.min()), int(wide.columns.max()) + 1)
+    wide = wide.reindex(columns=years)
+    return wide.to_numpy(dtype=float), wide.index.astype(str).to_numpy(dtype=object), int(years[0])
+
+
+def period_labels(start, count):
+    # monthly period index (year * 12 + month - 1) -> year, month
+    p = np.arange(start, start + count)
+    return p // 12, p % 12 + 1
+
+
+def fingerprint(Y):
+    return hashlib.sha1(np.ascontiguousarray(Y).tobytes()).hexdigest()
+
+
+# ---------------------------------
+# MODEL
+# ---------------------------------
+def _smooth(Y, alpha, beta, gamma, level, trend, season, t0, warmup=0):
+    # Additive Holt-Winters recursion over the columns of Y, vectorized over
+    # every region and every parameter combination at once. State arrays
+    # broadcast as (combos, regions[, m]); NaN observations leave the state
+    # to coast on level + trend.
+    m = season.shape[-1]
+    # seasonal slot first so each step touches one contiguous block
+    season = np.moveaxis(season, -1, 0).copy()
+    sse = np.zeros(np.broadcast(level, alpha).shape)
+    for j in range(Y.shape[1]):
+        y = Y[:, j]
+        s = (t0 + j) % m
+        s_prev = season[s]
+        fitted = level + trend + s_prev
+
+        seen = np.isfinite(y)
+        y0 = np.where(seen, y, 0.0)
+        new_level = np.where(seen, alpha * (y0 - s_prev) + (1 - alpha) * (level + trend),
+                             level + trend)
+        trend = np.where(seen, beta * (new_level - level) + (1 - beta) * trend, trend)
+        season[s] = np.where(seen, gamma * (y0 - new_level) + (1 - gamma) * s_prev, s_prev)
+        level = new_level
+
+        if j >= warmup:
+            sse += np.where(seen, (y0 - fitted) ** 2, 0.0)
+    return level, trend, np.moveaxis(season, 0, -1), sse
+
+
+def _initial_state(Y, m, start):
+    # level/trend from the means of the first two seasons (or first two
+    # points for non-seasonal series), seasonal offsets from the first season
+    w = m if m > 1 else 1
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices
+        overall = np.nan_to_num(np.nanmean(Y, axis=1))
+        first = np.nanmean(Y[:, :w], axis=1)
+        second = np.nanmean(Y[:, w:2 * w], axis=1) if Y.shape[1] > w else first
+    first = np.where(np.isfinite(first), first, overall)
+    second = np.where(np.isfinite(second), second, first)
+
+    season = np.zeros((len(Y), m))
+    if m > 1:
+        season[:, :min(m, Y.shape[1])] = np.nan_to_num(Y[:, :m] - first[:, None])
+        # slot k of the season array is calendar position k, not column k
+        season = np.roll(season, start % m, axis=1)
+    return first, (second - first) / w, season, 2 * w
+
+
+class HoltWinters:
+    """Additive Holt-Winters models for many regions, fitted together.
+
+    Every region picks its own (alpha, beta, gamma) from a grid by one-step
+    in-sample error; the whole grid is evaluated as a single vectorized pass
+    over time. ``season_length=1`` gives Holt's linear trend for annual data.
+    """
+
+    def __init__(self, season_length=12, alphas=ALPHAS, betas=BETAS, gammas=GAMMAS):
+        self.m = season_length
+        self.grid = np.array([
+            (a, b, g) for a in alphas for b in betas
+            for g in (gammas if season_length > 1 else (0.0,))
+        ])
+
+    def fit(self, Y, regions, start):
+        level, trend, season, warmup = _initial_state(Y, self.m, start)
+        a, b, g = (self.grid[:, k, None] for k in range(3))
+        level, trend, season, sse = _smooth(
+            Y, a, b, g,
+            np.broadcast_to(level, (len(self.grid), len(Y))),
+            np.broadcast_to(trend, (len(self.grid), len(Y))),
+            np.broadcast_to(season, (len(self.grid),) + season.shape),
+            start, warmup,
+        )
+
+        best = sse.argmin(axis=0)
+        rows = np.arange(len(Y))
+        self.alpha, self.beta, self.gamma = (self.grid[best, k] for k in range(3))
+        self.level, self.trend = level[best, rows], trend[best, rows]
+        self.season = season[best, rows]
+        self.rmse = np.sqrt(sse[best, rows] / max(1, Y.shape[1] - warmup))
+
+        self.regions, self.start, self.n_periods = regions, start, Y.shape[1]
+        self.fingerprint = fingerprint(Y)
+        return self
+
+    def update(self, Y_new):
+        # carry the fitted state forward over new periods, parameters fixed
+        self.level, self.trend, self.season, _ = _smooth(
+            Y_new, self.alpha, self.beta, self.gamma,
+            self.level, self.trend, self.season, self.start + self.n_periods,
+        )
+        self.n_periods += Y_new.shape[1]
+        return self
+
+    def refresh(self, Y, regions, start):
+        """Fit, or only roll the cached state forward if the history is unchanged."""
+        if (
+            getattr(self, "fingerprint", None) is not None
+            and start == self.start
+            and np.array_equal(regions, self.regions)
+            and Y.shape[1] >= self.n_periods
+            and fingerprint(Y[:, :self.n_periods]) == self.fingerprint
+        ):
+            n = self.n_periods
+            if Y.shape[1] > n:
+                self.update(Y[:, n:])
+                self.fingerprint = fingerprint(Y)
+            return self, "updated" if Y.shape[1] > n else "cached"
+        return self.fit(Y, regions, start), "fitted"
+
+    def forecast(self, horizon):
+        h = np.arange(1, horizon + 1)
+        idx = (self.start + self.n_periods - 1 + h) % self.m
+        return self.level[:, None] + h * self.trend[:, None] + self.season[:, idx]
+
+    # ---------------------------------
+    # PERSISTENCE
+    # ---------------------------------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp, m=self.m, grid=self.grid, alpha=self.alpha, beta=self.beta,
+            gamma=self.gamma, level=self.level, trend=self.trend, season=self.season,
+            rmse=self.rmse, regions=self.regions.astype(str), start=self.start,
+            n_periods=self.n_periods, fingerprint=self.fingerprint,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            model = cls(season_length=int(z["m"]))
+            model.grid = z["grid"]
+            for name in ["alpha", "beta", "gamma", "level", "trend", "season", "rmse"]:
+                setattr(model, name, z[name])
+            model.regions = z["regions"].astype(object)
+            model.start, model.n_periods = int(z["start"]), int(z["n_periods"])
+            model.fingerprint = str(z["fingerprint"])
+        return model
+
+
+def load_or_create(name, season_length):
+    path = os.path.join(FORECAST_DIR, f"{name}.npz")
+    if os.path.exists(path):
+        model = HoltWinters.load(path)
+        if model.m == season_length:
+            return model, path
+    return HoltWinters(season_length), path
@@ -0,0 +1,137 @@
+import functools
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+GAZETTEER_PATH = "gazetteer.csv"
+EARTH_RADIUS_KM = 6371.0
+
+
+# ---------------------------------
+# LOAD (cached per process)
+# ---------------------------------
+def _norm(values):
+    return pd.Series(values, dtype="object").astype(str).str.strip().str.casefold()
+
+
+@functools.lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_PATH):
+    gaz = pd.read_csv(path)
+    gaz["city_key"] = _norm(gaz["city"]).to_numpy()
+    gaz["state_key"] = _norm(gaz["state"]).to_numpy()
+    return gaz
+
+
+@functools.lru_cache(maxsize=None)
+def _lookup_tables(path=GAZETTEER_PATH):
+    gaz = load_gazetteer(path)
+    by_pair = {
+        (s, c): i for i, (s, c) in enumerate(zip(gaz["state_key"], gaz["city_key"]))
+    }
+    # city-only fallback keeps the first entry for a name
+    by_city = {}
+    for i, c in enumerate(gaz["city_key"]):
+        by_city.setdefault(c, i)
+    return by_pair, by_city
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([
+        np.cos(lat) * np.cos(lon),
+        np.cos(lat) * np.sin(lon),
+        np.sin(lat),
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def _tree(path=GAZETTEER_PATH):
+    gaz = load_gazetteer(path)
+    return cKDTree(_unit_vectors(gaz["latitude"].to_numpy(), gaz["longitude"].to_numpy()))
+
+
+# ---------------------------------
+# FORWARD: city (+ state) -> lat/lon
+# ---------------------------------
+def geocode(city, state=None, path=GAZETTEER_PATH):
+    # Names are factorized first, so the dictionary lookup runs once per
+    # distinct (state, city) pair and the result is gathered back to every
+    # row. Unknown cities get NaN rather than a made-up point.
+    gaz = load_gazetteer(path)
+    by_pair, by_city = _lookup_tables(path)
+
+    city_codes, city_uniques = pd.factorize(city, use_na_sentinel=True)
+    city_keys = _norm(city_uniques).to_numpy()
+
+    if state is None:
+        uniq_idx = np.array([by_city.get(c, -1) for c in city_keys], dtype=np.int64)
+        row_idx = np.where(city_codes >= 0, uniq_idx[city_codes], -1)
+    else:
+        state_codes, state_uniques = pd.factorize(state, use_na_sentinel=True)
+        state_keys = _norm(state_uniques).to_numpy()
+
+        pair = state_codes.astype(np.int64) * (len(city_keys) + 1) + city_codes
+        pair_uniques, inverse = np.unique(pair, return_inverse=True)
+
+        uniq_idx = np.empty(len(pair_uniques), dtype=np.int64)
+        for k, p in enumerate(pair_uniques):
+            s, c = divmod(int(p), len(city_keys) + 1)
+            if c >= len(city_keys):
+                uniq_idx[k] = -1
+                continue
+            key = (state_keys[s] if s >= 0 else None, city_keys[c])
+            uniq_idx[k] = by_pair.get(key, by_city.get(city_keys[c], -1))
+        row_idx = uniq_idx[inverse.ravel()]
+
+    found = row_idx >= 0
+    lat = np.full(len(row_idx), np.nan)
+    lon = np.full(len(row_idx), np.nan)
+    lat[found] = gaz["latitude"].to_numpy()[row_idx[found]]
+    lon[found] = gaz["longitude"].to_numpy()[row_idx[found]]
+
+    index = city.index if isinstance(city, pd.Series) else None
+    return pd.DataFrame({"latitude": lat, "longitude": lon}, index=index)
+
+
+def add_coordinates(df, city_col="city", state_col="state"):
+    state = df[state_col] if state_col in df.columns else None
+    coords = geocode(df[city_col], state)
+    df = df.copy()
+    df["latitude"] = coords["latitude"].to_numpy()
+    df["longitude"] = coords["longitude"].to_numpy()
+    return df
+
+
+# ---------------------------------
+# REVERSE: lat/lon -> nearest city
+# ---------------------------------
+def reverse_geocode(latitude, longitude, max_km=None, path=GAZETTEER_PATH):
+    gaz = load_gazetteer(path)
+    lat = np.asarray(latitude, dtype=float)
+    lon = np.asarray(longitude, dtype=float)
+
+    valid = np.isfinite(lat) & np.isfinite(lon)
+    idx = np.full(len(lat), -1, dtype=np.int64)
+    dist_km = np.full(len(lat), np.nan)
+
+    if valid.any():
+        chord, nearest = _tree(path).query(_unit_vectors(lat[valid], lon[valid]))
+        # chord length on the unit sphere -> great-circle distance
+        dist_km[valid] = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+        idx[valid] = nearest
+
+    if max_km is not None:
+        idx[dist_km > max_km] = -1
+
+    found = idx >= 0
+    city = np.full(len(idx), None, dtype=object)
+    state = np.full(len(idx), None, dtype=object)
+    city[found] = gaz["city"].to_numpy()[idx[found]]
+    state[found] = gaz["state"].to_numpy()[idx[found]]
+
+    return pd.DataFrame({
+        "city": city,
+        "state": state,
+        "distance_km": np.where(found, dist_km, np.nan),
+    })
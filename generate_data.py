@@ -1,54 +1,212 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import random
-
-states_cities = {
-    "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Nashik"],
-    "Gujarat": ["Ahmedabad", "Surat", "Vadodara"],
-    "Karnataka": ["Bengaluru", "Mysuru", "Mangaluru"],
-    "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai"],
-    "West Bengal": ["Kolkata", "Howrah", "Durgapur"],
+from scipy.special import ndtr
+
+import features
+import store
+
+OUT_TABLE = "incidents_full"
+ROWS = 800
+SEED = 42
+SHARD_ROWS = 1_000_000
+YEARS = (2015, 2025)
+
+# casualties and economic loss move together (Gaussian copula correlation);
+# each keeps its uniform marginal unless a disaster type sets an intensity
+LOSS_CORRELATION = 0.6
+CASUALTY_RANGE = (0, 40)
+LOSS_RANGE = (0.1, 80.0)
+RESPONSE_RANGE = (1.0, 24.0)
+
+# month weights Jan..Dec
+FLAT = [1] * 12
+MONSOON = [1, 1, 1, 1, 2, 6, 8, 8, 6, 2, 1, 1]
+
+DEFAULT_CONFIG = {
+    "states": {
+        "Maharashtra": {"weight": 1, "cities": {"Mumbai": 1, "Pune": 1, "Nagpur": 1, "Nashik": 1}},
+        "Gujarat": {"weight": 1, "cities": {"Ahmedabad": 1, "Surat": 1, "Vadodara": 1}},
+        "Karnataka": {"weight": 1, "cities": {"Bengaluru": 1, "Mysuru": 1, "Mangaluru": 1}},
+        "Tamil Nadu": {"weight": 1, "cities": {"Chennai": 1, "Coimbatore": 1, "Madurai": 1}},
+        "West Bengal": {"weight": 1, "cities": {"Kolkata": 1, "Howrah": 1, "Durgapur": 1}},
+    },
+    "disasters": {
+        "Flood": {"weight": 1, "months": MONSOON, "intensity": 0.0},
+        "Fire": {"weight": 1, "months": [1, 2, 4, 6, 6, 3, 1, 1, 1, 2, 2, 1], "intensity": 0.0},
+        "Cyclone": {"weight": 1, "months": [1, 1, 1, 2, 5, 3, 1, 1, 2, 5, 6, 2], "intensity": 0.0},
+        "Earthquake": {"weight": 1, "months": FLAT, "intensity": 0.0},
+        "Landslide": {"weight": 1, "months": MONSOON, "intensity": 0.0},
+    },
 }
 
-disasters = ["Flood", "Fire", "Cyclone", "Earthquake", "Landslide"]
 
-rows = []
+# ---------------------------------
+# DISTRIBUTIONS
+# ---------------------------------
+def load_config(path=None):
+    if path is None:
+        return DEFAULT_CONFIG
+    with open(path) as f:
+        return json.load(f)
 
-for i in range(1, 801):
-    state = random.choice(list(states_cities.keys()))
-    city = random.choice(states_cities[state])
-    disaster = random.choice(disasters)
-    
-    month = random.randint(1, 12)
-    year = random.randint(2015, 2025)
 
-    casualties = random.randint(0, 40)
-    loss = round(random.uniform(0.1, 80), 2)
-    response_time = round(random.uniform(1, 24), 1)
+def _cdf(weights):
+    w = np.asarray(weights, dtype=float)
+    cdf = np.cumsum(w / w.sum())
+    cdf[-1] = 1.0
+    return cdf
 
-    # RULE BASED SEVERITY SCORE
-    score = (casualties * 0.4) + (loss * 0.4) + ((24 - response_time) * 0.2)
 
-    if score < 15:
-        severity = "Low"
-    elif score < 35:
-        severity = "Medium"
-    else:
-        severity = "High"
+def _tables(config):
+    # flatten state -> city into one joint (state, city) distribution
+    pair_state, pair_city, pair_w = [], [], []
+    states = list(config["states"])
+    for s_idx, (state, spec) in enumerate(config["states"].items()):
+        total = sum(spec["cities"].values())
+        for city, w in spec["cities"].items():
+            pair_state.append(s_idx)
+            pair_city.append(city)
+            pair_w.append(spec["weight"] * w / total)
+
+    # the same city name may appear under two states
+    city_code, cities = pd.factorize(pd.Series(pair_city))
+
+    disasters = list(config["disasters"])
+    specs = config["disasters"].values()
+    return {
+        "states": states,
+        "cities": list(cities),
+        "pair_city": city_code.astype(np.int32),
+        "pair_state": np.array(pair_state, dtype=np.int32),
+        "pair_cdf": _cdf(pair_w),
+        "disasters": disasters,
+        "disaster_cdf": _cdf([d["weight"] for d in specs]),
+        "month_cdf": [_cdf(d["months"]) for d in specs],
+        "intensity": np.array([d.get("intensity", 0.0) for d in specs]),
+    }
+
+
+def _draw(rng, cdf, n):
+    return np.searchsorted(cdf, rng.random(n), side="right").astype(np.int32)
+
+
+# ---------------------------------
+# GENERATE
+# ---------------------------------
+def generate_shard(n, seed, shard=0, id_offset=0, config=DEFAULT_CONFIG):
+    """``n`` incidents from shard ``shard``; same (seed, shard) gives same rows."""
+    t = _tables(config)
+    rng = np.random.default_rng([seed, shard])
+
+    pair = _draw(rng, t["pair_cdf"], n)
+    disaster = _draw(rng, t["disaster_cdf"], n)
+
+    # seasonality: months drawn per disaster type from its own profile
+    month = np.empty(n, dtype=np.int64)
+    u = rng.random(n)
+    for d, cdf in enumerate(t["month_cdf"]):
+        rows = disaster == d
+        month[rows] = np.searchsorted(cdf, u[rows], side="right") + 1
+
+    z1 = rng.standard_normal(n) + t["intensity"][disaster]
+    z2 = LOSS_CORRELATION * z1 + np.sqrt(1 - LOSS_CORRELATION ** 2) * rng.standard_normal(n)
+    c_lo, c_hi = CASUALTY_RANGE
+    l_lo, l_hi = LOSS_RANGE
+    r_lo, r_hi = RESPONSE_RANGE
 
-    rows.append({
-        "incident_id": i,
-        "state": state,
-        "city": city,
-        "disaster_type": disaster,
+    df = pd.DataFrame({
+        "incident_id": np.arange(id_offset + 1, id_offset + n + 1),
+        "state": pd.Categorical.from_codes(t["pair_state"][pair], t["states"], validate=False),
+        "city": pd.Categorical.from_codes(t["pair_city"][pair], t["cities"], validate=False),
+        "disaster_type": pd.Categorical.from_codes(disaster, t["disasters"], validate=False),
         "month": month,
-        "year": year,
-        "casualties": casualties,
-        "economic_loss_crores": loss,
-        "response_time_hours": response_time,
-        "severity": severity
+        "year": rng.integers(YEARS[0], YEARS[1] + 1, n),
+        "casualties": np.minimum((ndtr(z1) * (c_hi - c_lo + 1)).astype(np.int64) + c_lo, c_hi),
+        "economic_loss_crores": (l_lo + ndtr(z2) * (l_hi - l_lo)).round(2),
+        "response_time_hours": rng.uniform(r_lo, r_hi, n).round(1),
     })
 
-df = pd.DataFrame(rows)
-df.to_csv("incidents_full.csv", index=False)
+    # RULE BASED SEVERITY SCORE (column-wise, see features.py)
+    df["risk_score"] = features.risk_score(df)
+    df["severity"] = features.severity_from_score(df["risk_score"])
+    return df
+
+
+def _shards(rows, shard_rows):
+    return [(i, i * shard_rows, min(shard_rows, rows - i * shard_rows))
+            for i in range(-(-rows // shard_rows))]
+
+
+def _write_shard(args):
+    shard, offset, n, seed, config, fmt, target = args
+    df = generate_shard(n, seed, shard, offset, config)
+    if fmt == "parquet":
+        store.write_part(target, shard, df)
+    else:
+        df.to_csv(os.path.join(target, f"part-{shard:05d}.csv"), index=False)
+    return n
+
+
+def generate(rows=ROWS, seed=SEED, shard_rows=SHARD_ROWS, jobs=None,
+             config=DEFAULT_CONFIG, fmt="parquet", table=OUT_TABLE, out_dir=None):
+    """Write ``rows`` incidents as shards, generated in parallel processes.
+
+    Shard boundaries depend only on ``shard_rows``, so output is identical
+    whatever the number of workers.
+    """
+    if fmt == "parquet":
+        target = store.begin_write(table)
+    else:
+        target = out_dir
+        os.makedirs(target, exist_ok=True)
+
+    tasks = [(i, off, n, seed, config, fmt, target) for i, off, n in _shards(rows, shard_rows)]
+    try:
+        if len(tasks) == 1 or jobs == 1:
+            written = sum(map(_write_shard, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                written = sum(pool.map(_write_shard, tasks))
+    except BaseException:
+        if fmt == "parquet":
+            store.abort_write(target)
+        raise
+
+    if fmt == "parquet":
+        return store.commit_write(table, target), written
+    return target, written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seeded, vectorized synthetic incident generator."
+    )
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--config", help="JSON with state/city/disaster weights and month profiles")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--table", default=OUT_TABLE, help="store table for parquet output")
+    parser.add_argument("--out-dir", default="incidents_csv", help="directory for csv shards")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path, rows = generate(
+        args.rows, args.seed, args.shard_rows, args.jobs,
+        load_config(args.config), args.format, args.table, args.out_dir,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {path}/ created with {rows:,} rows "
+          f"in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
 
-print("✅ incidents_full.csv created with", len(df), "rows")
+if __name__ == "__main__":
+    main()
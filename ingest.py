@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import store
+from prepare_final_dataset import NUM_COLS, clean
+
+TABLE = "final_dataset"
+
+# raw incident fields, in table order; derived columns (season, risk_score)
+# are recomputed by clean() and not hashed
+RAW_COLS = ["incident_id", "state", "city", "disaster_type", "month", "year",
+            "casualties", "economic_loss_crores", "response_time_hours", "severity"]
+TEXT_COLS = ["state", "city", "disaster_type", "severity"]
+INT_COLS = ["incident_id", "month", "year", "casualties"]
+FINGERPRINT_COLS = RAW_COLS
+
+# parts must share one schema; CSV/JSON batches can come in as floats
+DTYPES = {"incident_id": np.int64, "month": np.int64, "year": np.int64,
+          "casualties": np.int64, "economic_loss_crores": np.float64,
+          "response_time_hours": np.float64}
+
+
+# ---------------------------------
+# TYPES
+# ---------------------------------
+def type_errors(batch):
+    """Rows clean() would coerce instead of reject: text fields that are not
+    non-empty strings, integer fields with a fractional part (2.7 casualties
+    would be stored as 2)."""
+    bad = np.zeros(len(batch), dtype=bool)
+    for c in TEXT_COLS:
+        values = batch[c]
+        if isinstance(values.dtype, pd.StringDtype):
+            text = values.notna().to_numpy()
+        else:
+            text = values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        bad |= ~text | values.astype(str).str.strip().eq("").to_numpy()
+    for c in INT_COLS:
+        number = pd.to_numeric(batch[c], errors="coerce").to_numpy(dtype=np.float64)
+        bad |= np.isfinite(number) & (number % 1 != 0)
+    return bad
+
+
+# ---------------------------------
+# FINGERPRINTS
+# ---------------------------------
+def fingerprints(df):
+    """64-bit content hash per row, stable across runs and dtypes.
+
+    Text is compared trimmed and numbers as float64, so a row read back
+    from the store (categoricals, ints) hashes like the CSV it came from.
+    """
+    canon = pd.DataFrame({
+        c: df[c].astype(str).str.strip().to_numpy(dtype=object) for c in TEXT_COLS
+    })
+    for c in NUM_COLS:
+        canon[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float64).round(6).to_numpy()
+    hashed = pd.util.hash_pandas_object(canon, index=False).to_numpy()
+    # sqlite integers are signed
+    return hashed.view(np.int64)
+
+
+def incident_ids(df):
+    return pd.to_numeric(df["incident_id"], errors="coerce").astype(np.int64).to_numpy()
+
+
+# ---------------------------------
+# INDEX
+# ---------------------------------
+class FingerprintIndex:
+    """On-disk (incident_id, content hash) index for one store table.
+
+    Lookups cost O(batch log n) through the primary key, whatever the size
+    of the table. The index remembers the table version it has seen: parts
+    appended by other writers are indexed on the next open, and a rewritten
+    table (e.g. prepare_final_dataset.py --rebuild) is re-indexed from scratch.
+    """
+
+    def __init__(self, table=TABLE, path=None):
+        self.table = table
+        self.path = path or os.path.join(store.DATA_DIR, f"{table}.ingest.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " incident_id INTEGER NOT NULL, hash INTEGER NOT NULL,"
+            " PRIMARY KEY (incident_id, hash)) WITHOUT ROWID"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # ---------------------------------
+    # SYNC WITH THE TABLE
+    # ---------------------------------
+    def _synced_version(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None:
+            return None
+        # JSON turns the version tuples into lists
+        version = json.loads(row[0])
+        if version and isinstance(version[0], list):
+            return tuple(tuple(v) for v in version)
+        return tuple(version) if version else None
+
+    def _set_version(self, version):
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('version', ?)", (json.dumps(version),)
+        )
+
+    def sync(self):
+        if not store.exists(self.table):
+            return 0
+
+        since = self._synced_version()
+        version, parts = store.changed_parts(self.table, since)
+        if since is not None and version == since:
+            return 0
+
+        if parts is None:
+            self.db.execute("DELETE FROM rows")
+        df = store.read_table(self.table, columns=FINGERPRINT_COLS, parts=parts)
+        self._insert(incident_ids(df), fingerprints(df))
+        self._set_version(version)
+        self.db.commit()
+        return len(df)
+
+    def _insert(self, ids, hashes):
+        self.db.executemany(
+            "INSERT OR IGNORE INTO rows VALUES (?, ?)",
+            zip(ids.tolist(), hashes.tolist()),
+        )
+
+    # ---------------------------------
+    # LOOKUP
+    # ---------------------------------
+    def lookup(self, ids, hashes):
+        """Per row: ``seen`` (same id and content) and ``conflict`` (id
+        already stored with different content)."""
+        self.db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS batch (pos INTEGER, incident_id INTEGER, hash INTEGER)"
+        )
+        self.db.execute("DELETE FROM batch")
+        self.db.executemany(
+            "INSERT INTO batch VALUES (?, ?, ?)",
+            zip(range(len(ids)), ids.tolist(), hashes.tolist()),
+        )
+
+        seen = np.zeros(len(ids), dtype=bool)
+        conflict = np.zeros(len(ids), dtype=bool)
+        rows = self.db.execute(
+            "SELECT b.pos, MAX(r.hash = b.hash) FROM batch b"
+            " JOIN rows r ON r.incident_id = b.incident_id GROUP BY b.pos"
+        ).fetchall()
+        if rows:
+            pos, same = np.array(rows, dtype=np.int64).T
+            seen[pos[same == 1]] = True
+            conflict[pos[same == 0]] = True
+        return seen, conflict
+
+    def append(self, df):
+        # index first, inside a transaction that only commits once the part
+        # is written: a failed append leaves neither behind
+        ids, hashes = incident_ids(df), fingerprints(df)
+        try:
+            self._insert(ids, hashes)
+            store.append_table(self.table, df)
+            self._set_version(store.table_version(self.table))
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+
+# ---------------------------------
+# INGEST
+# ---------------------------------
+def ingest(batch, table=TABLE, index=None):
+    """Validate and deduplicate ``batch``; append the new rows to ``table``.
+
+    Returns (appended rows, rejected rows, stats). Rows already stored are
+    dropped; rows whose incident_id is stored with different content are
+    rejected as conflicts, as are invalid rows.
+    """
+    missing = [c for c in RAW_COLS if c not in batch.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    batch = batch[RAW_COLS].reset_index(drop=True)
+
+    own = index is None
+    index = index or FingerprintIndex(table)
+    try:
+        with instrumentation.timer("ingest_sync_seconds", table=table):
+            index.sync()
+
+        with instrumentation.timer("ingest_validate_seconds", table=table):
+            # clean() also drops exact repeats within the batch
+            valid = clean(batch[~type_errors(batch)]).astype(DTYPES)
+        dropped = batch.index.difference(valid.index)
+        exact_repeat = batch.duplicated()
+        invalid = batch.loc[dropped[~exact_repeat[dropped].to_numpy()]].assign(reason="invalid")
+
+        ids, hashes = incident_ids(valid), fingerprints(valid)
+        with instrumentation.timer("ingest_lookup_seconds", table=table):
+            seen, conflict = index.lookup(ids, hashes)
+
+        # repeats inside the batch that only differ in formatting; a second
+        # version of an id within the batch is a conflict like a stored one
+        repeat = pd.Series(list(zip(ids, hashes))).duplicated().to_numpy()
+        conflict |= pd.Series(ids).duplicated().to_numpy() & ~repeat
+        new = ~seen & ~conflict & ~repeat
+
+        fresh = valid[new]
+        if len(fresh):
+            with instrumentation.timer("ingest_append_seconds", table=table):
+                index.append(fresh)
+    finally:
+        if own:
+            index.close()
+
+    rejected = pd.concat(
+        [invalid, valid.loc[conflict, RAW_COLS].assign(reason="conflict")], ignore_index=True
+    )
+    stats = {
+        "received": len(batch),
+        "appended": int(new.sum()),
+        "duplicates": int((seen | (repeat & ~conflict)).sum() + exact_repeat.sum()),
+        "conflicts": int(conflict.sum()),
+        "invalid": len(invalid),
+    }
+    for key, value in stats.items():
+        instrumentation.count(f"ingest_rows_{key}_total", value, table=table)
+    return fresh, rejected, stats
+
+
+def read_batch(path):
+    if path.endswith((".jsonl", ".json")):
+        return pd.read_json(path, lines=True)
+    return pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Append a batch of incidents to the store, skipping rows already ingested."
+    )
+    parser.add_argument("inputs", nargs="+", help="CSV or JSONL batches, ingested in order")
+    parser.add_argument("--table", default=TABLE)
+    parser.add_argument("--rejects", help="write invalid and conflicting rows to this CSV")
+    args = parser.parse_args()
+
+    index = FingerprintIndex(args.table)
+    rejects = []
+    try:
+        for path in args.inputs:
+            start = time.perf_counter()
+            _, rejected, stats = ingest(read_batch(path), args.table, index)
+            elapsed = time.perf_counter() - start
+            rejects.append(rejected)
+            print(f"✅ {path}: {stats['appended']:,} appended, {stats['duplicates']:,} duplicates, "
+                  f"{stats['conflicts']:,} conflicts, {stats['invalid']:,} invalid "
+                  f"in {elapsed * 1000:.0f} ms")
+    finally:
+        index.close()
+
+    rejected = pd.concat(rejects, ignore_index=True)
+    if args.rejects and len(rejected):
+        rejected.to_csv(args.rejects, index=False)
+        print(f"⚠️ {len(rejected)} rejected rows → {args.rejects}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import bisect
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_DIR = "logs"
+
+# seconds; the last bucket (+Inf) is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 10_000, 100_000)
+
+
+# ---------------------------------
+# METRICS
+# ---------------------------------
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Process-wide counters and histograms, keyed by name and labels.
+
+    Everything is guarded by one lock; an observation is a dict lookup and
+    a bisect, cheap enough for per-request use.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name=None, **labels):
+        def decorate(fn):
+            metric = name or f"{fn.__module__}_{fn.__name__}_seconds"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(metric, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    # ---------------------------------
+    # EXPORT
+    # ---------------------------------
+    def to_prometheus(self):
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{fmt(labels)} {value}")
+
+            for (name, labels), hist in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {hist.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {hist.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        def label_str(labels):
+            return ",".join(f"{k}={v}" for k, v in labels)
+
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed_s": time.time() - self.started,
+                "counters": [
+                    {"name": n, "labels": label_str(lb), "value": v}
+                    for (n, lb), v in sorted(self.counters.items())
+                ],
+                "histograms": [
+                    {
+                        "name": n,
+                        "labels": label_str(lb),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else None,
+                        "min": h.min if h.count else None,
+                        "max": h.max if h.count else None,
+                        "p50": h.quantile(0.5),
+                        "p99": h.quantile(0.99),
+                    }
+                    for (n, lb), h in sorted(self.histograms.items())
+                ],
+            }
+
+
+METRICS = Metrics()
+count = METRICS.count
+observe = METRICS.observe
+timer = METRICS.timer
+timed = METRICS.timed
+
+
+# ---------------------------------
+# FILES
+# ---------------------------------
+def _atomic_write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_prometheus(path, metrics=METRICS):
+    # textfile-collector format, replaced atomically so scrapers never see half a file
+    _atomic_write(path, metrics.to_prometheus())
+    return path
+
+
+def write_run_summary(name, metrics=METRICS, log_dir=LOG_DIR):
+    # one JSON file per script run: logs/runs/<name>-<timestamp>.json
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(log_dir, "runs", f"{name}-{stamp}.json")
+    _atomic_write(path, json.dumps({"run": name, **metrics.summary()}, indent=2))
+    return path
+
+
+# ---------------------------------
+# PROFILING
+# ---------------------------------
+@contextmanager
+def profile(name, log_dir=LOG_DIR, top=25):
+    """cProfile everything in the block (current thread only).
+
+    The raw profile goes to logs/profiles/<name>-<timestamp>.prof for
+    snakeviz/pstats; the yielded dict gets ``path`` and a text ``report``.
+    """
+    result = {}
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(log_dir, "profiles", f"{name}-{stamp}-{time.time_ns() % 10**6}.prof")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        result.update(path=path, report=out.getvalue())
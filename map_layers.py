@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# upper bound on markers sent to the browser, whatever the incident count
+MAX_CELLS = 1500
+
+# grid cells across one web-map tile at a given zoom level
+CELLS_PER_TILE = 8
+
+
+def cell_size_deg(zoom):
+    # a tile spans 360 / 2**zoom degrees of longitude
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+def _grid(lat, lon, size):
+    ix = np.floor(lon / size).astype(np.int64)
+    iy = np.floor(lat / size).astype(np.int64)
+    return iy * 1_000_003 + ix
+
+
+def bin_points(df, zoom, lat="lat", lon="lon", weight=None,
+               severity="severity", casualties="casualties", max_cells=MAX_CELLS):
+    """Aggregate points into square grid cells sized for ``zoom``.
+
+    Each cell reports the number of incidents (``weight`` column if points
+    are already pre-aggregated), total casualties, the count-weighted
+    centroid and the dominant severity. If the grid would still exceed
+    ``max_cells``, the cell size is doubled until it fits.
+    """
+    df = df[df[lat].notna() & df[lon].notna()]
+    columns = ["lat", "lon", "count", "casualties", "severity", "cell_deg"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    w = df[weight].to_numpy(dtype=float) if weight else np.ones(len(df))
+    la = df[lat].to_numpy(dtype=float)
+    lo = df[lon].to_numpy(dtype=float)
+
+    size = cell_size_deg(zoom)
+    cells = _grid(la, lo, size)
+    n_cells = len(pd.unique(cells))
+    while n_cells > max_cells:
+        # cell count shrinks roughly with area, so jump straight to the
+        # power-of-two size that should fit, then re-check
+        size *= 2 ** max(1, int(np.ceil(np.log2(np.sqrt(n_cells / max_cells)))))
+        cells = _grid(la, lo, size)
+        n_cells = len(pd.unique(cells))
+
+    points = pd.DataFrame({
+        "cell": cells,
+        "w": w,
+        "wlat": la * w,
+        "wlon": lo * w,
+        "casualties": df[casualties].to_numpy(dtype=float),
+        "severity": pd.Categorical(df[severity]),
+    })
+
+    agg = points.groupby("cell").agg(
+        count=("w", "sum"),
+        wlat=("wlat", "sum"),
+        wlon=("wlon", "sum"),
+        casualties=("casualties", "sum"),
+    )
+    agg["lat"] = agg["wlat"] / agg["count"]
+    agg["lon"] = agg["wlon"] / agg["count"]
+
+    by_severity = (
+        points.groupby(["cell", "severity"], observed=True)["w"].sum().unstack(fill_value=0)
+    )
+    agg["severity"] = by_severity.idxmax(axis=1).astype(str)
+    agg["cell_deg"] = size
+
+    return agg.reset_index()[columns]
@@ -0,0 +1,275 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder
+
+import registry
+import store
+from features import CAT_FEATURES, NUM_FEATURES, RISK_FEATURES
+
+CACHE_DIR = ".cache/model_selection"
+RESULTS_DIR = "models"
+LATENCY_REPEATS = 20
+
+PARAM_GRID = {
+    "n_estimators": [100, 200, 300],
+    "max_depth": [None, 8, 16],
+    "min_samples_leaf": [1, 2, 5],
+}
+
+
+# ---------------------------------
+# TASKS
+# ---------------------------------
+def severity_preprocessor():
+    return ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_FEATURES),
+            ("num", "passthrough", NUM_FEATURES),
+        ]
+    )
+
+
+TASKS = {
+    "severity": {
+        "table": "final_dataset",
+        "features": CAT_FEATURES + NUM_FEATURES,
+        "target": "severity",
+        "preprocessor": severity_preprocessor,
+        "model_path": "models/severity_model.pkl",
+    },
+    "risk": {
+        "table": "risk_processed",
+        "features": RISK_FEATURES,
+        "target": "risk_category",
+        "preprocessor": None,
+        "model_path": "risk_model.pkl",
+        "encoder_path": "label_encoder.pkl",
+    },
+}
+
+
+def load_task(name):
+    task = TASKS[name]
+    df = store.read_table(task["table"], columns=task["features"] + [task["target"]])
+    X = df[task["features"]]
+    y = df[task["target"]].astype(str).to_numpy()
+    return task, X, y
+
+
+def candidates(grid=PARAM_GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+# ---------------------------------
+# FOLD CACHE
+# ---------------------------------
+def _dense(X):
+    X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def prepare_folds(name, task, X, y, n_splits, seed):
+    """Fit the preprocessor once per fold and cache the transformed matrices.
+
+    The cache key covers the table version, the fold layout and the
+    preprocessing code, so a rerun on unchanged data skips this step and
+    every candidate reads the same memory-mapped arrays.
+    """
+    key = hashlib.sha1(repr((
+        name, store.table_version(task["table"]), n_splits, seed, task["features"],
+    )).encode()).hexdigest()[:12]
+    fold_dir = os.path.join(CACHE_DIR, f"{name}-{key}")
+
+    paths = [os.path.join(fold_dir, f"fold{k}.joblib") for k in range(n_splits)]
+    if all(os.path.exists(p) for p in paths):
+        return paths, True
+
+    os.makedirs(fold_dir, exist_ok=True)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    for path, (train, test) in zip(paths, splitter.split(X, y)):
+        X_train, X_test = X.iloc[train], X.iloc[test]
+        if task["preprocessor"] is not None:
+            pre = task["preprocessor"]().fit(X_train)
+            X_train, X_test = pre.transform(X_train), pre.transform(X_test)
+        fold = {
+            "X_train": _dense(X_train), "y_train": y[train],
+            "X_test": _dense(X_test), "y_test": y[test],
+        }
+        tmp = path + ".tmp"
+        joblib.dump(fold, tmp)
+        os.replace(tmp, path)
+    return paths, False
+
+
+# ---------------------------------
+# WORKER
+# ---------------------------------
+def evaluate(params, fold_path, seed):
+    fold = joblib.load(fold_path, mmap_mode="r")
+    model = RandomForestClassifier(
+        **params, class_weight="balanced", random_state=seed, n_jobs=1
+    )
+
+    start = time.perf_counter()
+    model.fit(fold["X_train"], fold["y_train"])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pred = model.predict(fold["X_test"])
+    batch_s = time.perf_counter() - start
+
+    # single-incident latency, what the dashboard and serve.py pay per call
+    row = fold["X_test"][:1]
+    times = []
+    for _ in range(LATENCY_REPEATS):
+        t = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - t)
+
+    return {
+        "accuracy": accuracy_score(fold["y_test"], pred),
+        "fit_s": fit_s,
+        "batch_predict_s": batch_s,
+        "row_latency_ms": float(np.median(times)) * 1000,
+    }
+
+
+# ---------------------------------
+# SEARCH
+# ---------------------------------
+def search(name, n_splits=5, jobs=None, seed=42, grid=PARAM_GRID):
+    task, X, y = load_task(name)
+    fold_paths, cached = prepare_folds(name, task, X, y, n_splits, seed)
+    print(f"{'♻️' if cached else '✅'} {n_splits} folds for '{name}' "
+          f"({'cached' if cached else 'prepared'})")
+
+    cands = candidates(grid)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {
+            (i, k): pool.submit(evaluate, params, path, seed)
+            for i, params in enumerate(cands)
+            for k, path in enumerate(fold_paths)
+        }
+        scores = {key: f.result() for key, f in futures.items()}
+    wall_s = time.perf_counter() - start
+
+    rows = []
+    for i, params in enumerate(cands):
+        folds = [scores[i, k] for k in range(n_splits)]
+        acc = [f["accuracy"] for f in folds]
+        rows.append({
+            **params,
+            "accuracy": np.mean(acc),
+            "accuracy_std": np.std(acc),
+            "fit_s": np.mean([f["fit_s"] for f in folds]),
+            "wall_s": sum(f["fit_s"] + f["batch_predict_s"] for f in folds),
+            "row_latency_ms": np.median([f["row_latency_ms"] for f in folds]),
+        })
+    results = pd.DataFrame(rows).sort_values("accuracy", ascending=False)
+    return results, wall_s
+
+
+def pick(results, latency_budget_ms=None):
+    ok = results
+    if latency_budget_ms is not None:
+        ok = results[results["row_latency_ms"] <= latency_budget_ms]
+        if ok.empty:
+            print(f"⚠️ No candidate meets {latency_budget_ms} ms; using the fastest")
+            ok = results.nsmallest(1, "row_latency_ms")
+    return ok.iloc[0]
+
+
+def _clean_params(best):
+    params = {k: best[k] for k in PARAM_GRID}
+    params["n_estimators"] = int(params["n_estimators"])
+    params["min_samples_leaf"] = int(params["min_samples_leaf"])
+    params["max_depth"] = None if pd.isna(params["max_depth"]) else int(params["max_depth"])
+    return params
+
+
+def refit(name, params, cv_accuracy, seed=42):
+    # retrain on every row with the chosen parameters, same artifact format
+    # as train_final_model.py / train_risk_model.py
+    task, X, y = load_task(name)
+    model = RandomForestClassifier(**params, class_weight="balanced", random_state=seed)
+
+    extras = {}
+    if task["preprocessor"] is not None:
+        clf = Pipeline(steps=[("preprocess", task["preprocessor"]()), ("model", model)])
+        clf.fit(X, y)
+    else:
+        encoder = LabelEncoder()
+        clf = model.fit(X, encoder.fit_transform(y))
+        joblib.dump(encoder, task["encoder_path"])
+        extras["label_encoder"] = encoder
+
+    os.makedirs(os.path.dirname(task["model_path"]) or ".", exist_ok=True)
+    joblib.dump(clf, task["model_path"])
+    version = registry.register(
+        name, clf,
+        data_hash=registry.table_hash(task["table"]),
+        metrics={"cv_accuracy": float(cv_accuracy)},
+        features=task["features"],
+        params=params,
+        extras=extras,
+    )
+    return task["model_path"], version
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cross-validated random-forest search for the severity and WRI risk models."
+    )
+    parser.add_argument("task", choices=sorted(TASKS))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="only pick candidates whose single-row latency fits")
+    parser.add_argument("--save", action="store_true",
+                        help="refit the chosen candidate on all rows and save it")
+    args = parser.parse_args()
+
+    results, wall_s = search(args.task, args.folds, args.jobs)
+    print(results.round(4).to_string(index=False))
+    print(f"\n⏱️ {len(results)} candidates x {args.folds} folds in {wall_s:.1f}s")
+
+    best = pick(results, args.latency_budget_ms)
+    params = _clean_params(best)
+    print(f"🏆 {params}: accuracy {best['accuracy']:.4f}, "
+          f"{best['row_latency_ms']:.2f} ms/row")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"model_selection_{args.task}.json")
+    with open(out, "w") as f:
+        json.dump({
+            "task": args.task,
+            "folds": args.folds,
+            "latency_budget_ms": args.latency_budget_ms,
+            "best": params,
+            "candidates": json.loads(results.to_json(orient="records")),
+        }, f, indent=2)
+    print(f"✅ Results saved to {out}")
+
+    if args.save:
+        path, version = refit(args.task, params, best["accuracy"])
+        print(f"✅ Saved model to: {path} (registered as {args.task} {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+STATE_DIR = ".pipeline"
+STATE_FILE = os.path.join(STATE_DIR, "state.json")
+LOG_DIR = os.path.join(STATE_DIR, "logs")
+
+
+# ---------------------------------
+# STAGES
+# ---------------------------------
+@dataclass
+class Stage:
+    name: str
+    script: str
+    inputs: list
+    outputs: list
+    # files the stage depends on beyond the script and the repo modules it
+    # imports (those are found by local_modules)
+    code: list = field(default_factory=list)
+
+
+STAGES = [
+    Stage("clean_emdat", "clean_emdat_data.py",
+          inputs=["emdat_raw.csv", "gazetteer.csv"], outputs=["data/emdat_processed"]),
+    Stage("clean_risk", "clean_risk_data.py",
+          inputs=["risk_raw.csv"], outputs=["data/risk_processed"]),
+    Stage("train_risk", "train_risk_model.py",
+          inputs=["data/risk_processed"], outputs=["risk_model.pkl", "label_encoder.pkl"]),
+    Stage("score_risk", "score_risk.py",
+          inputs=["data/risk_processed", "risk_model.pkl", "label_encoder.pkl"],
+          outputs=["data/risk_scores"]),
+    Stage("prepare", "prepare_final_dataset.py",
+          inputs=["risk_new.csv"], outputs=["data/final_dataset"]),
+    Stage("train_severity", "train_final_model.py",
+          inputs=["data/final_dataset"], outputs=["models/severity_model.pkl"]),
+    Stage("compile_severity", "compiled_model.py",
+          inputs=["models/severity_model.pkl", "data/final_dataset"],
+          outputs=["models/severity_compiled"]),
+    Stage("forecast", "risk_forecast.py",
+          inputs=["data/final_dataset", "data/risk_processed"],
+          outputs=["data/risk_forecast", "data/wri_forecast"]),
+    Stage("coordinates", "add_coordinates.py",
+          inputs=["data/final_dataset", "gazetteer.csv"], outputs=["data/mapped_dataset"]),
+]
+
+
+def dependencies(stages):
+    producers = {out: s.name for s in stages for out in s.outputs}
+    return {
+        s.name: sorted({producers[i] for i in s.inputs if i in producers} - {s.name})
+        for s in stages
+    }
+
+
+def upstream_closure(targets, deps):
+    selected, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+# ---------------------------------
+# HASHING (memoised on size + mtime so unchanged files are not re-read)
+# ---------------------------------
+def _files(path):
+    if os.path.isdir(path):
+        for root, _, names in sorted(os.walk(path)):
+            for n in sorted(names):
+                if not n.endswith((".tmp", ".old")):
+                    yield os.path.join(root, n)
+    elif os.path.exists(path):
+        yield path
+
+
+def file_hash(path, memo):
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+    cached = memo.get(path)
+    if cached and cached["stamp"] == stamp:
+        return cached["sha"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    memo[path] = {"stamp": stamp, "sha": h.hexdigest()}
+    return memo[path]["sha"]
+
+
+def paths_hash(paths, memo):
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(p.encode())
+        for f in _files(p):
+            h.update(os.path.relpath(f, p).encode())
+            h.update(file_hash(f, memo).encode())
+    return h.hexdigest()
+
+
+def _module_files(name):
+    # "store" -> store.py; "benchmarks.synthetic" -> benchmarks/synthetic.py;
+    # anything not in the repo (numpy, json, ...) -> nothing
+    path = name.replace(".", os.sep)
+    return [p for p in (f"{path}.py", os.path.join(path, "__init__.py")) if os.path.isfile(p)]
+
+
+def local_modules(script):
+    """``script`` and every repo module it imports, directly or not."""
+    found, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path in found or not os.path.isfile(path):
+            continue
+        found.add(path)
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+        # walks function bodies too, for imports done lazily
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            else:
+                continue
+            for name in names:
+                todo.extend(_module_files(name))
+    return sorted(found)
+
+
+def stage_key(stage, memo):
+    return paths_hash(local_modules(stage.script) + stage.code + stage.inputs, memo)
+
+
+# ---------------------------------
+# RUNNER
+# ---------------------------------
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {"stages": {}, "hashes": {}}
+
+
+def save_state(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, STATE_FILE)
+
+
+def is_fresh(stage, state, memo):
+    record = state["stages"].get(stage.name)
+    if not record or record["key"] != stage_key(stage, memo):
+        return False
+    if not all(os.path.exists(o) for o in stage.outputs):
+        return False
+    return record["outputs"] == paths_hash(stage.outputs, memo)
+
+
+def run_stage(stage):
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage.name}.log")
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.run(
+            [sys.executable, stage.script], stdout=log, stderr=subprocess.STDOUT
+        )
+    return proc.returncode, time.perf_counter() - start, log_path
+
+
+def run(targets=None, force=False, jobs=None, dry_run=False, stages=STAGES):
+    by_name = {s.name: s for s in stages}
+    deps = dependencies(stages)
+    selected = upstream_closure(targets or list(by_name), deps)
+
+    state = load_state()
+    memo = state["hashes"]
+
+    pending = set(selected)
+    done, failed, results = set(), set(), {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while pending or running:
+            # schedule every stage whose upstream stages have all finished
+            for name in sorted(pending):
+                stage = by_name[name]
+                if any(d in pending or d in running.values() for d in deps[name]):
+                    continue
+                pending.discard(name)
+
+                if any(d in failed for d in deps[name]):
+                    failed.add(name)
+                    results[name] = "blocked"
+                    continue
+
+                missing = [i for i in stage.inputs if not os.path.exists(i)
+                           and not any(i in by_name[d].outputs for d in deps[name])]
+                if missing:
+                    # e.g. no EM-DAT export on this machine: skip the branch
+                    failed.add(name)
+                    results[name] = f"skipped, missing input {missing}"
+                    continue
+
+                if not force and is_fresh(stage, state, memo):
+                    done.add(name)
+                    results[name] = "up to date"
+                    continue
+
+                if dry_run:
+                    done.add(name)
+                    results[name] = "would run"
+                    continue
+
+                print(f"▶ {name}: python {stage.script}")
+                running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = by_name[name]
+                code, elapsed, log_path = future.result()
+
+                if code == 0:
+                    done.add(name)
+                    results[name] = f"ran in {elapsed:.1f}s"
+                    state["stages"][name] = {
+                        "key": stage_key(stage, memo),
+                        "outputs": paths_hash(stage.outputs, memo),
+                    }
+                    save_state(state)
+                else:
+                    failed.add(name)
+                    results[name] = f"failed (exit {code}), see {log_path}"
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the data/training stages, skipping ones whose inputs and code are unchanged."
+    )
+    parser.add_argument("targets", nargs="*", help="stages to build (default: all)")
+    parser.add_argument("--force", action="store_true", help="rerun even if up to date")
+    parser.add_argument("--jobs", type=int, help="max stages running at once")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--list", action="store_true", help="print the stage DAG")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, ds in dependencies(STAGES).items():
+            print(f"{name} ← {', '.join(ds) or '-'}")
+        return
+
+    unknown = set(args.targets) - {s.name for s in STAGES}
+    if unknown:
+        parser.error(f"unknown stages: {sorted(unknown)}")
+
+    results = run(args.targets, args.force, args.jobs, args.dry_run)
+
+    print("\n📋 Pipeline summary")
+    for s in STAGES:
+        if s.name in results:
+            print(f"  {s.name:<18} {results[s.name]}")
+
+    if any(r.startswith("failed") for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from features import FEATURES, season
+
+MAX_ENTRIES = 50_000
+TTL_SECONDS = 3600.0
+
+# inputs that make up the key; season is derived from month
+KEY_COLUMNS = [c for c in FEATURES if c != "season"]
+TEXT_COLUMNS = ["state", "city", "disaster_type"]
+INT_COLUMNS = ["month", "year", "casualties"]
+FLOAT_COLUMNS = ["economic_loss_crores", "response_time_hours"]
+# 2.50 and 2.5 (and 2.5000001 from a float slider) are the same request
+FLOAT_DECIMALS = 4
+
+
+# ---------------------------------
+# NORMALIZE
+# ---------------------------------
+def normalize(df):
+    """Canonical model input: trimmed strings, ints, rounded floats, season."""
+    out = pd.DataFrame(index=df.index)
+    for c in TEXT_COLUMNS:
+        out[c] = df[c].astype(str).str.strip()
+    for c in INT_COLUMNS:
+        out[c] = pd.to_numeric(df[c]).astype(np.int64)
+    for c in FLOAT_COLUMNS:
+        out[c] = pd.to_numeric(df[c]).astype(float).round(FLOAT_DECIMALS)
+    out["season"] = season(out["month"])
+    return out[FEATURES]
+
+
+def keys(normalized):
+    """64-bit hash of each normalized row, computed column-wise.
+
+    Like ingest.py's fingerprints, collisions are negligible at any cache
+    size this process will hold.
+    """
+    return pd.util.hash_pandas_object(normalized[KEY_COLUMNS], index=False).to_numpy()
+
+
+# ---------------------------------
+# CACHE
+# ---------------------------------
+class PredictionCache:
+    """Bounded LRU of predicted probabilities with a TTL.
+
+    Entries are keyed by (model version, normalized feature tuple), so a
+    promoted or refreshed model never sees the previous version's results;
+    those age out of the LRU on their own.
+    """
+
+    def __init__(self, maxsize=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, version, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((version, key))
+                if entry is None:
+                    continue
+                if now - entry[0] > self.ttl:
+                    del self._entries[(version, key)]
+                    self.expired += 1
+                    continue
+                self._entries.move_to_end((version, key))
+                found[key] = entry[1]
+        return found
+
+    def put_many(self, version, items):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items:
+                self._entries[(version, key)] = (now, value)
+                self._entries.move_to_end((version, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+        instrumentation.count("prediction_cache_hits_total", hits)
+        instrumentation.count("prediction_cache_misses_total", misses)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+# one per process: the dashboard, serve.py and batch_score.py all use it
+CACHE = PredictionCache()
+
+
+# ---------------------------------
+# PREDICT
+# ---------------------------------
+def cached_rows(cache, version, X, compute):
+    """One result row per row of the normalized frame ``X``.
+
+    ``compute`` is called once, on the distinct rows of ``X`` that are not
+    cached for ``version``, and must return one row per input row.
+    """
+    if len(X) == 0:
+        return compute(X)
+    row_keys = keys(X)
+    unique, first, inverse = np.unique(row_keys, return_index=True, return_inverse=True)
+    unique, inverse = unique.tolist(), inverse.ravel()
+
+    found = cache.get_many(version, unique)
+    missing = [i for i, k in enumerate(unique) if k not in found]
+    if missing:
+        computed = compute(X.iloc[first[missing]])
+        # copies: a view would keep the whole batch's result alive
+        cache.put_many(version, ((unique[i], row.copy()) for i, row in zip(missing, computed)))
+    cache.record(len(row_keys) - len(missing), len(missing))
+
+    if not found:
+        return computed[inverse]
+    rows = np.empty((len(unique),) + next(iter(found.values())).shape)
+    for i, k in enumerate(unique):
+        if k in found:
+            rows[i] = found[k]
+    if missing:
+        rows[missing] = computed
+    return rows[inverse]
+
+
+def predict_proba(model, version, df, cache=CACHE):
+    """``model.predict_proba`` over ``df``, scoring only rows not cached.
+
+    Duplicate rows within ``df`` are scored once. Returns the (n, classes)
+    probability matrix in the row order of ``df``.
+    """
+    def score(rows):
+        with instrumentation.timer("model_predict_seconds"):
+            return model.predict_proba(rows)
+
+    return cached_rows(cache, version, normalize(df), score)
@@ -1,57 +1,79 @@
+import argparse
+
 import pandas as pd
 
+import features
+import instrumentation
+import store
+
 RAW = "risk_new.csv"
-OUT = "final_dataset.csv"
+OUT = "final_dataset"
 
-df = pd.read_csv(RAW)
+NUM_COLS = ["month", "year", "casualties",
+            "economic_loss_crores", "response_time_hours"]
 
-print("Rows before cleaning:", len(df))
 
 # ---------------------------------
 # CLEAN
 # ---------------------------------
-df.drop_duplicates(inplace=True)
+def clean(df):
+    df = df.drop_duplicates()
 
-# Ensure correct types
-num_cols = ["month", "year", "casualties",
-            "economic_loss_crores", "response_time_hours"]
-df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+    # Ensure correct types
+    df = df.copy()
+    df[NUM_COLS] = df[NUM_COLS].apply(pd.to_numeric, errors="coerce")
 
-# Remove invalid rows
-df.dropna(inplace=True)
-df = df[
-    (df["month"] >= 1) & (df["month"] <= 12) &
-    (df["casualties"] >= 0) &
-    (df["economic_loss_crores"] >= 0) &
-    (df["response_time_hours"] > 0)
-]
+    # Remove invalid rows
+    df = df.dropna()
+    df = df[
+        (df["month"] >= 1) & (df["month"] <= 12) &
+        (df["casualties"] >= 0) &
+        (df["economic_loss_crores"] >= 0) &
+        (df["response_time_hours"] > 0)
+    ]
 
-print("Rows after cleaning:", len(df))
+    # ---------------------------------
+    # FEATURE ENGINEERING
+    # ---------------------------------
+
+    # SEASON + RISK SCORE (shared with serving, see features.py)
+    return features.add_features(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Clean {RAW} into the {OUT} table."
+    )
+    parser.add_argument("--rebuild", action="store_true",
+                        help=f"rewrite {OUT} from {RAW} alone, dropping rows added by ingest.py")
+    args = parser.parse_args()
+
+    with instrumentation.timer("prepare_read_seconds"):
+        df = pd.read_csv(RAW)
+    print("Rows before cleaning:", len(df))
+
+    if store.list_parts(OUT) and not args.rebuild:
+        # the table also holds rows appended by ingest.py: add only the
+        # incidents it does not have yet instead of rewriting it
+        from ingest import ingest
+        with instrumentation.timer("prepare_ingest_seconds"):
+            _, _, stats = ingest(df, OUT)
+        print(f"Rows appended: {stats['appended']} ({stats['duplicates']} already stored)")
+        if stats["conflicts"]:
+            print(f"⚠️ {stats['conflicts']} rows differ from the stored incident with the same "
+                  f"incident_id and were kept as stored (--rebuild to replace them)")
+    else:
+        with instrumentation.timer("prepare_clean_seconds"):
+            df = clean(df)
+        print("Rows after cleaning:", len(df))
+
+        with instrumentation.timer("prepare_write_seconds"):
+            store.write_table(OUT, df)
+        print(df.head())
+
+    print(f"\n✅ FINAL DATASET → {store.table_dir(OUT)}/")
+    print(f"✅ Timings → {instrumentation.write_run_summary('prepare_final_dataset')}")
 
-# ---------------------------------
-# FEATURE ENGINEERING
-# ---------------------------------
 
-# SEASON
-def season(m):
-    if m in [12,1,2]:
-        return "Winter"
-    if m in [3,4,5]:
-        return "Summer"
-    if m in [6,7,8,9]:
-        return "Monsoon"
-    return "Post-Monsoon"
-
-df["season"] = df["month"].apply(season)
-
-# RISK SCORE
-df["risk_score"] = (
-    df["casualties"] * 0.4
-    + df["economic_loss_crores"] * 0.4
-    + (24 - df["response_time_hours"]) * 0.2
-)
-
-df.to_csv(OUT, index=False)
-
-print("\n✅ FINAL DATASET CREATED → final_dataset.csv")
-print(df.head())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+import registry
+import store
+from compiled_model import export
+from features import FEATURES
+
+DATA_TABLE = "final_dataset"
+MODEL_PATH = "models/severity_model.pkl"
+STATE_PATH = "models/severity_refresh.json"
+REPLAY_PATH = "models/severity_replay.parquet"
+
+NEW_TREES = 50
+REPLAY_ROWS = 2000
+
+
+# ---------------------------------
+# STATE
+# ---------------------------------
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return None
+    with open(STATE_PATH) as f:
+        state = json.load(f)
+    state["version"] = tuple(tuple(p) for p in state["version"])
+    return state
+
+
+def _atomic(path, write):
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save_state(state):
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2)
+    _atomic(STATE_PATH, write)
+
+
+# ---------------------------------
+# REPLAY BUFFER (bounded reservoir sample of past rows)
+# ---------------------------------
+def update_replay(replay, delta, seen, rng, size=REPLAY_ROWS):
+    # Algorithm R applied to a whole batch: stream row i (0-based) takes a
+    # random slot with probability size / (i + 1)
+    pool = pd.concat([replay, delta], ignore_index=True)
+    take = np.arange(min(size, len(pool)))
+
+    start = len(take) - len(replay)
+    rest = np.arange(max(start, 0), len(delta))
+    if len(rest):
+        slots = (rng.random(len(rest)) * (seen + rest + 1)).astype(np.int64)
+        keep = slots < size
+        take[slots[keep]] = len(replay) + rest[keep]
+    return pool.iloc[take].reset_index(drop=True)
+
+
+# ---------------------------------
+# REFRESH
+# ---------------------------------
+def grow_forest(clf, X, y, n_trees, seed):
+    """Train ``n_trees`` on (X, y) and swap them in for the oldest trees."""
+    forest = clf.named_steps["model"]
+    Xt = clf.named_steps["preprocess"].transform(X)
+
+    params = forest.get_params()
+    params.update(n_estimators=n_trees, random_state=seed, n_jobs=None)
+    fresh = RandomForestClassifier(**params).fit(Xt, y)
+
+    if not np.array_equal(fresh.classes_, forest.classes_):
+        raise ValueError(
+            f"new window has classes {list(fresh.classes_)}, model has {list(forest.classes_)}"
+        )
+
+    # estimators_ is kept oldest-first, so retiring is a slice off the front
+    window = len(forest.estimators_)
+    forest.estimators_ = (forest.estimators_ + fresh.estimators_)[-window:]
+    forest.n_estimators = len(forest.estimators_)
+    return clf
+
+
+def trained_parts(meta):
+    """Parts of the table the registered model was trained on.
+
+    Unchanged table (same data_hash): all of them. Parts appended since
+    training (recorded table_version is a prefix): the ones before. None
+    when that cannot be told, e.g. the table was rewritten.
+    """
+    if meta is None:
+        return None
+    if registry.table_hash(DATA_TABLE) == meta["data_hash"]:
+        if not store.list_parts(DATA_TABLE):
+            store.write_table(DATA_TABLE, store.read_table(DATA_TABLE))
+        return store.list_parts(DATA_TABLE)
+
+    trained = meta.get("table_version")
+    if not trained or not isinstance(trained[0], list):
+        return None
+    trained = tuple(tuple(p) for p in trained)
+    _, appended = store.changed_parts(DATA_TABLE, trained)
+    if appended is None:
+        return None
+    return store.list_parts(DATA_TABLE)[:len(trained)]
+
+
+def baseline(columns, replay_rows):
+    # first run: the replay buffer starts from the rows the current model
+    # was trained on; rows appended after training are left as the delta
+    meta = registry.metadata("severity")
+    parts = trained_parts(meta)
+    if parts is None:
+        raise SystemExit(
+            f"⚠️ the current severity model ({meta['version'] if meta else 'legacy pickle'}) "
+            f"was not trained on the current {DATA_TABLE}; run train_final_model.py first"
+        )
+    df = store.read_table(DATA_TABLE, columns=columns, parts=parts, categorical=False)
+    replay = update_replay(df.iloc[:0], df, 0, np.random.default_rng(0), replay_rows)
+    _atomic(REPLAY_PATH, lambda p: replay.to_parquet(p, index=False))
+
+    state = {"version": store.table_version(DATA_TABLE)[:len(parts)], "seen": len(df),
+             "refreshes": 0}
+    save_state(state)
+    return state
+
+
+def refresh(n_trees=NEW_TREES, replay_rows=REPLAY_ROWS):
+    state = load_state()
+    columns = FEATURES + ["severity"]
+
+    first = state is None
+    if first:
+        state = baseline(columns, replay_rows)
+
+    version, new_parts = store.changed_parts(DATA_TABLE, state["version"])
+    if new_parts is None:
+        raise SystemExit(
+            f"⚠️ {DATA_TABLE} was rewritten since the last refresh; "
+            f"run train_final_model.py and delete {STATE_PATH}"
+        )
+    if not new_parts:
+        return ("baseline", state["seen"]) if first else ("up to date", 0)
+
+    delta = store.read_table(DATA_TABLE, columns=columns, parts=new_parts, categorical=False)
+    replay = pd.read_parquet(REPLAY_PATH)
+
+    # the new trees see the delta plus a fixed-size sample of history, so
+    # cost stays O(delta) and every class is still represented
+    window = pd.concat([replay, delta], ignore_index=True)
+
+    refreshes = state["refreshes"] + 1
+    parent = registry.current_version("severity")
+    clf = registry.load("severity")
+    grow_forest(clf, window[FEATURES], window["severity"], n_trees, seed=refreshes)
+    _atomic(MODEL_PATH, lambda p: joblib.dump(clf, p))
+    registry.register(
+        "severity", clf,
+        data_hash=registry.table_hash(DATA_TABLE),
+        features=FEATURES,
+        params=clf.named_steps["model"].get_params(),
+        compiled=export(clf),
+        parent=parent,
+        table_version=version,
+        refresh={"rows": len(delta), "trees": n_trees, "count": refreshes},
+    )
+
+    rng = np.random.default_rng(refreshes)
+    replay = update_replay(replay, delta, state["seen"], rng, replay_rows)
+    _atomic(REPLAY_PATH, lambda p: replay.to_parquet(p, index=False))
+    save_state({"version": version, "seen": state["seen"] + len(delta), "refreshes": refreshes})
+    return "refreshed", len(delta)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Refresh the severity model with rows appended since the last run."
+    )
+    parser.add_argument("--trees", type=int, default=NEW_TREES,
+                        help="trees trained on the new window; as many old trees are retired")
+    parser.add_argument("--replay-rows", type=int, default=REPLAY_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    status, rows = refresh(args.trees, args.replay_rows)
+    elapsed = time.perf_counter() - start
+
+    if status == "baseline":
+        print(f"✅ Recorded baseline at {rows} rows; later runs consume only new rows")
+    elif status == "up to date":
+        print("✅ No new rows since the last refresh")
+    else:
+        print(f"✅ Refreshed {MODEL_PATH} with {rows} new rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
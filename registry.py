@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import joblib
+
+import instrumentation
+import store
+from compiled_model import CompiledForest, export
+
+REGISTRY_DIR = "models/registry"
+CURRENT = "CURRENT"
+
+# pre-registry artifacts, used until a model has a registered version
+LEGACY_PATHS = {
+    "severity": "models/severity_model.pkl",
+    "risk": "risk_model.pkl",
+}
+
+
+# ---------------------------------
+# LAYOUT
+#   models/registry/<name>/CURRENT           -> "v0003"
+#   models/registry/<name>/v0003/meta.json
+#   models/registry/<name>/v0003/model.joblib
+#   models/registry/<name>/v0003/<extra>.joblib
+#   models/registry/<name>/v0003/compiled/*.npy   (memory-mapped on load)
+# ---------------------------------
+def _name_dir(name):
+    return os.path.join(REGISTRY_DIR, name)
+
+
+def _version_dir(name, version):
+    return os.path.join(_name_dir(name), version)
+
+
+def versions(name):
+    if not os.path.isdir(_name_dir(name)):
+        return []
+    return sorted(v for v in os.listdir(_name_dir(name)) if v.startswith("v") and v[1:].isdigit())
+
+
+def current_version(name):
+    path = os.path.join(_name_dir(name), CURRENT)
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip()
+    found = versions(name)
+    return found[-1] if found else None
+
+
+def _stamp(name):
+    # cheap change token: one stat() call, no file reads
+    for path in (os.path.join(_name_dir(name), CURRENT), LEGACY_PATHS.get(name)):
+        if path and os.path.exists(path):
+            return path, os.stat(path).st_mtime_ns
+    return None
+
+
+def table_hash(table):
+    h = hashlib.sha256()
+    paths = store.list_parts(table) or [store.csv_path(table)]
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+# ---------------------------------
+# WRITE
+# ---------------------------------
+def register(name, model, data_hash=None, metrics=None, features=None,
+             params=None, compiled=None, extras=None, promote_now=True, **info):
+    """Store ``model`` as the next version of ``name`` and return the version.
+
+    ``compiled`` is an optional CompiledForest saved as raw .npy arrays so
+    workers can memory-map it; ``extras`` maps names to further objects
+    (e.g. a label encoder) stored next to the model.
+    """
+    os.makedirs(_name_dir(name), exist_ok=True)
+    found = versions(name)
+    version = f"v{int(found[-1][1:]) + 1 if found else 1:04d}"
+
+    staging = _version_dir(name, "." + version + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    joblib.dump(model, os.path.join(staging, "model.joblib"))
+    for key, obj in (extras or {}).items():
+        joblib.dump(obj, os.path.join(staging, f"{key}.joblib"))
+    if compiled is not None:
+        compiled.save(os.path.join(staging, "compiled"))
+
+    classes = getattr(model, "classes_", None)
+    meta = {
+        "name": name,
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data_hash": data_hash,
+        "metrics": metrics or {},
+        "features": list(features) if features is not None else None,
+        "classes": [str(c) for c in classes] if classes is not None else None,
+        "params": params or {},
+        "extras": sorted(extras or {}),
+        "compiled": compiled is not None,
+        **info,
+    }
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2, default=str)
+
+    os.replace(staging, _version_dir(name, version))
+    if promote_now:
+        promote(name, version)
+    return version
+
+
+def promote(name, version):
+    if version not in versions(name):
+        raise ValueError(f"Unknown version '{version}' for model '{name}'")
+    path = os.path.join(_name_dir(name), CURRENT)
+    with open(path + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(path + ".tmp", path)
+
+
+# ---------------------------------
+# READ
+# ---------------------------------
+def metadata(name, version=None):
+    version = version or current_version(name)
+    if version is None:
+        return None
+    with open(os.path.join(_version_dir(name, version), "meta.json")) as f:
+        return json.load(f)
+
+
+def load(name, version=None, part="model"):
+    """Load one artifact of a registered model (``part``: model, compiled or an extra).
+
+    Falls back to the legacy pickle for models not registered yet. A
+    compiled part that was never saved is exported from the model in memory.
+    """
+    version = version or current_version(name)
+    path = _version_dir(name, version) if version else None
+    if part == "compiled":
+        if path and os.path.isdir(os.path.join(path, "compiled")):
+            return CompiledForest.load(os.path.join(path, "compiled"), mmap_mode="r")
+        return export(load(name, version))
+
+    if version is None:
+        if part == "model" and name in LEGACY_PATHS:
+            return joblib.load(LEGACY_PATHS[name])
+        raise FileNotFoundError(f"No registered versions of '{name}'")
+
+    # no mmap_mode: unpickling a sklearn tree copies its arrays anyway
+    return joblib.load(os.path.join(path, f"{part}.joblib"))
+
+
+class LazyModel:
+    """Loads a registered model on first use and follows promotions.
+
+    ``get()`` costs one stat() of the CURRENT pointer; when it changes the
+    newly promoted version is loaded, so a running dashboard or service
+    hot-swaps without a restart.
+
+    Only ``part="compiled"`` is shared between processes: its arrays are
+    memory-mapped and load in milliseconds. The sklearn pickle is loaded
+    into each process's own memory.
+    """
+
+    def __init__(self, name, part="model"):
+        self.name = name
+        self.part = part
+        self.version = None
+        self._obj = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        stamp = _stamp(self.name)
+        if self._obj is None or stamp != self._stamp:
+            with self._lock:
+                if self._obj is None or stamp != self._stamp:
+                    version = current_version(self.name)
+                    with instrumentation.timer("model_load_seconds", model=self.name):
+                        self._obj = load(self.name, version, self.part)
+                    instrumentation.count("model_loads_total", model=self.name)
+                    self.version = version or "legacy"
+                    self._stamp = stamp
+        return self._obj
+
+
+# ---------------------------------
+# CLI
+# ---------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and promote registered models.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list versions of a model").add_argument("name")
+    show = sub.add_parser("show", help="print a version's metadata")
+    show.add_argument("name")
+    show.add_argument("version", nargs="?")
+    promo = sub.add_parser("promote", help="point CURRENT at a version")
+    promo.add_argument("name")
+    promo.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = current_version(args.name)
+        for v in versions(args.name):
+            meta = metadata(args.name, v)
+            marker = "*" if v == current else " "
+            print(f"{marker} {v}  {meta['created_at']}  {json.dumps(meta['metrics'])}")
+    elif args.command == "show":
+        print(json.dumps(metadata(args.name, args.version), indent=2))
+    else:
+        promote(args.name, args.version)
+        print(f"✅ {args.name} → {args.version}")
+
+
+if __name__ == "__main__":
+    main()
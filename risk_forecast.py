@@ -1,18 +1,94 @@
+import argparse
+import time
+
+import numpy as np
 import pandas as pd
 
-df = pd.read_csv("final_dataset.csv")
+import store
+from forecasting import annual_values, load_or_create, monthly_counts, period_labels
+
+INCIDENT_TABLE = "final_dataset"
+WRI_TABLE = "risk_processed"
+HORIZON_MONTHS = 12
+HORIZON_YEARS = 3
+
+
+# ---------------------------------
+# INCIDENTS: monthly counts per region
+# ---------------------------------
+def forecast_incidents(level="state", horizon=HORIZON_MONTHS):
+    df = store.read_table(INCIDENT_TABLE, columns=[level, "year", "month"])
+    Y, regions, start = monthly_counts(df, level)
+
+    model, path = load_or_create(f"incidents_{level}", season_length=12)
+    model, status = model.refresh(Y, regions, start)
+    model.save(path)
+
+    # counts cannot go negative
+    pred = np.clip(model.forecast(horizon), 0, None)
+    year, month = period_labels(start + Y.shape[1], horizon)
+
+    out = pd.DataFrame({
+        level: np.repeat(regions, horizon),
+        "year": np.tile(year, len(regions)),
+        "month": np.tile(month, len(regions)),
+        "horizon": np.tile(np.arange(1, horizon + 1), len(regions)),
+        "forecast_risk": pred.ravel(),
+        "rmse": np.repeat(model.rmse, horizon),
+    })
+    out["period"] = out["year"].astype(str) + "-" + out["month"].map("{:02d}".format)
+    return out, status
+
+
+# ---------------------------------
+# WRI: annual index per country
+# ---------------------------------
+def forecast_wri(horizon=HORIZON_YEARS):
+    df = store.read_table(WRI_TABLE, columns=["region", "year", "wri"])
+    Y, regions, start = annual_values(df, "region", "wri")
+
+    model, path = load_or_create("wri", season_length=1)
+    model, status = model.refresh(Y, regions, start)
+    model.save(path)
+
+    pred = np.clip(model.forecast(horizon), 0, None)
+    years = np.arange(start + Y.shape[1], start + Y.shape[1] + horizon)
+
+    out = pd.DataFrame({
+        "region": np.repeat(regions, horizon),
+        "year": np.tile(years, len(regions)),
+        "horizon": np.tile(np.arange(1, horizon + 1), len(regions)),
+        "forecast_wri": pred.ravel(),
+        "rmse": np.repeat(model.rmse, horizon),
+    })
+    return out, status
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-region Holt-Winters forecasts of incident counts and WRI."
+    )
+    parser.add_argument("--level", default="state", choices=["state", "city"],
+                        help="region granularity for incident forecasts")
+    parser.add_argument("--months", type=int, default=HORIZON_MONTHS)
+    parser.add_argument("--years", type=int, default=HORIZON_YEARS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    incidents, status = forecast_incidents(args.level, args.months)
+    store.write_table("risk_forecast", incidents)
+    print(f"✅ Incident forecast: {incidents[args.level].nunique()} regions x "
+          f"{args.months} months ({status})")
 
-# Group by state-month to get disaster frequency
-trend = df.groupby(["state","month"]).size().reset_index(name="count")
+    if store.exists(WRI_TABLE):
+        wri, status = forecast_wri(args.years)
+        store.write_table("wri_forecast", wri)
+        print(f"✅ WRI forecast: {wri['region'].nunique()} regions x {args.years} years ({status})")
+    else:
+        print(f"⚠️ {WRI_TABLE} not found, skipping WRI forecast")
 
-# Compute rolling 3-month average risk
-trend["forecast_risk"] = (
-    trend.groupby("state")["count"]
-    .rolling(3, min_periods=1)
-    .mean()
-    .reset_index(level=0, drop=True)
-)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
 
-trend.to_csv("risk_forecast.csv", index=False)
 
-print("✅ Future risk data created")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import registry
+import store
+from features import RISK_FEATURES
+
+SOURCE_TABLE = "risk_processed"
+OUT_TABLE = "risk_scores"
+ENCODER_PATH = "label_encoder.pkl"
+
+KEY = ["region", "year"]
+
+
+# ---------------------------------
+# MODEL
+# ---------------------------------
+def load_artifacts():
+    # model and label encoder are registered together; before the first
+    # registration fall back to the pickles train_risk_model.py leaves behind
+    version = registry.current_version("risk")
+    model = registry.load("risk", version)
+    if version is None:
+        return model, joblib.load(ENCODER_PATH), "legacy"
+    return model, registry.load("risk", version, part="label_encoder"), version
+
+
+# ---------------------------------
+# SCORE
+# ---------------------------------
+def score(df, model, encoder, version):
+    """One predict_proba over every region-year in ``df``."""
+    df = df.dropna(subset=KEY + RISK_FEATURES)
+
+    with instrumentation.timer("model_predict_seconds", model="risk"):
+        proba = model.predict_proba(df[RISK_FEATURES])
+    classes = encoder.inverse_transform(model.classes_)
+
+    out = pd.DataFrame({
+        "region": df["region"].astype(str).to_numpy(),
+        "year": df["year"].astype(np.int64).to_numpy(),
+        "wri": df["wri"].to_numpy(),
+        "predicted_category": classes[proba.argmax(axis=1)],
+        "confidence": proba.max(axis=1),
+    })
+    for i, cls in enumerate(classes):
+        out[f"proba_{cls}"] = proba[:, i]
+    if "risk_category" in df.columns:
+        out["reported_category"] = df["risk_category"].astype(str).to_numpy()
+    out["model_version"] = version
+    return out
+
+
+def upsert(scores, table=OUT_TABLE):
+    # new releases replace earlier scores for the same region-year
+    if store.exists(table):
+        old = store.read_table(table, categorical=False)
+        seen = pd.MultiIndex.from_frame(scores[KEY])
+        old = old[~pd.MultiIndex.from_frame(old[KEY]).isin(seen)]
+        scores = pd.concat([old, scores], ignore_index=True)
+    return scores
+
+
+def score_table(source=SOURCE_TABLE, input_path=None, table=OUT_TABLE):
+    model, encoder, version = load_artifacts()
+
+    if input_path:
+        scores = upsert(score(pd.read_csv(input_path), model, encoder, version), table)
+    else:
+        scores = score(store.read_table(source), model, encoder, version)
+
+    # sorted by (region, year) so lookups read one contiguous run of rows
+    scores = scores.sort_values(KEY, ignore_index=True)
+    store.write_table(table, scores)
+    return scores, version
+
+
+# ---------------------------------
+# LOOKUP
+# ---------------------------------
+def load_scores(table=OUT_TABLE):
+    """The scores table indexed by (region, year), for .loc / .xs lookups."""
+    scores = store.read_table(table)
+    scores["region"] = scores["region"].astype(str)
+    return scores.set_index(KEY).sort_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score every region-year with the WRI risk-category model."
+    )
+    parser.add_argument("--source", default=SOURCE_TABLE, help="store table to score")
+    parser.add_argument(
+        "--input",
+        help="CSV of a new WRI release (risk_processed columns); "
+             "its region-years are added to or replace existing scores",
+    )
+    parser.add_argument("--table", default=OUT_TABLE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scores, version = score_table(args.source, args.input, args.table)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(scores):,} region-years scored with risk {version} "
+          f"in {elapsed:.2f}s → {store.table_dir(args.table)}/")
+    print(scores["predicted_category"].value_counts().to_string())
+    if "reported_category" in scores.columns:
+        known = scores[scores["reported_category"].notna()]
+        match = (known["predicted_category"] == known["reported_category"]).mean()
+        print(f"Agreement with reported WRI category: {match:.1%}")
+
+
+if __name__ == "__main__":
+    main()
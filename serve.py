@@ -0,0 +1,328 @@
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import instrumentation
+from alerts import AlertEngine
+from features import FEATURES
+from prediction_cache import (
+    CACHE, FLOAT_COLUMNS, INT_COLUMNS, MAX_ENTRIES, TEXT_COLUMNS, TTL_SECONDS,
+    PredictionCache, predict_proba,
+)
+from registry import LazyModel
+
+HOST = "127.0.0.1"
+PORT = 8500
+MAX_BATCH = 64
+MAX_WAIT_MS = 5.0
+REQUEST_TIMEOUT = 30.0
+
+REQUIRED = [c for c in FEATURES if c != "season"]
+# the rows prepare_final_dataset.clean() keeps
+RANGES = {
+    "month": (lambda v: 1 <= v <= 12, "between 1 and 12"),
+    "casualties": (lambda v: v >= 0, ">= 0"),
+    "economic_loss_crores": (lambda v: v >= 0, ">= 0"),
+    "response_time_hours": (lambda v: v > 0, "> 0"),
+}
+
+
+def load_model():
+    # loaded on the first request; follows `registry.py promote` afterwards.
+    # Micro-batches are small, where the compiled arrays beat sklearn's
+    # per-call overhead (about 4 ms vs 30 ms at 64 rows)
+    return LazyModel("severity", part="compiled")
+
+
+# ---------------------------------
+# MICRO-BATCHER
+# ---------------------------------
+class MicroBatcher:
+    """Coalesces concurrent requests into one predict_proba call.
+
+    Handler threads submit their records and wait on a Future. A single
+    worker thread takes the first pending request, keeps collecting until
+    ``max_batch`` records or ``max_wait`` seconds, then scores everything
+    together and hands each request its own slice of the result.
+    """
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=MAX_WAIT_MS / 1000, cache=None):
+        self.model = model
+        self.cache = cache if cache is not None else CACHE
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.records = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, records):
+        future = Future()
+        self.queue.put((records, future))
+        return future
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._score(batch)
+            except Exception as exc:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(exc)
+                    continue
+                # one bad request must not fail the others: score each alone
+                instrumentation.count("batch_fallbacks_total")
+                for item in batch:
+                    self._score_alone(item)
+
+    def _score_alone(self, item):
+        try:
+            self._score([item])
+        except Exception as exc:
+            item[1].set_exception(exc)
+
+    def score_now(self, records):
+        # bypasses the queue: scores on the calling thread (used for profiling)
+        future = Future()
+        self._score([(records, future)])
+        return future.result()
+
+    def _score(self, batch):
+        df = pd.DataFrame([r for records, _ in batch for r in records])
+
+        if isinstance(self.model, LazyModel):
+            model = self.model.get()
+            version = self.model.version
+        else:
+            model, version = self.model, "static"
+        # repeated incidents come straight from the cache
+        proba = predict_proba(model, version, df, self.cache)
+        labels = model.classes_[proba.argmax(axis=1)]
+        classes = [str(c) for c in model.classes_]
+
+        self.batches += 1
+        self.records += len(df)
+        instrumentation.observe("batch_size_records", len(df), instrumentation.SIZE_BUCKETS)
+        instrumentation.count("records_scored_total", len(df))
+
+        start = 0
+        for records, future in batch:
+            end = start + len(records)
+            future.set_result([
+                {
+                    "severity": str(labels[i]),
+                    "probabilities": dict(zip(classes, proba[i].tolist())),
+                }
+                for i in range(start, end)
+            ])
+            start = end
+
+
+# ---------------------------------
+# HTTP
+# ---------------------------------
+def _number(value, field, integer):
+    # JSON true/false would pass as 1/0; numeric strings are accepted
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"'{field}' must be a number, got {value!r}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"'{field}' must be a number, got {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"'{field}' must be finite, got {value!r}")
+    if integer:
+        if not number.is_integer():
+            raise ValueError(f"'{field}' must be a whole number, got {value!r}")
+        if abs(number) >= 2 ** 63:
+            raise ValueError(f"'{field}' is out of range, got {value!r}")
+        return int(number)
+    return number
+
+
+def validate(payload):
+    """Records with the model's input fields, type-checked and converted.
+
+    Raises ValueError (HTTP 400) for anything that would fail scoring, so a
+    bad record never reaches a shared micro-batch.
+    """
+    records = payload if isinstance(payload, list) else [payload]
+    if not records:
+        raise ValueError("Empty payload")
+
+    clean = []
+    for i, r in enumerate(records):
+        if not isinstance(r, dict):
+            raise ValueError("Each incident must be a JSON object")
+        missing = [c for c in REQUIRED if c not in r]
+        if missing:
+            raise ValueError(f"Missing required fields: {missing}")
+        try:
+            record = {}
+            for c in TEXT_COLUMNS:
+                if not isinstance(r[c], str) or not r[c].strip():
+                    raise ValueError(f"'{c}' must be a non-empty string, got {r[c]!r}")
+                record[c] = r[c]
+            for c in INT_COLUMNS:
+                record[c] = _number(r[c], c, integer=True)
+            for c in FLOAT_COLUMNS:
+                record[c] = _number(r[c], c, integer=False)
+            for c, (ok, expected) in RANGES.items():
+                if not ok(record[c]):
+                    raise ValueError(f"'{c}' must be {expected}, got {r[c]!r}")
+        except ValueError as exc:
+            raise ValueError(f"Incident {i}: {exc}") from None
+        clean.append(record)
+    return clean
+
+
+class Handler(BaseHTTPRequestHandler):
+    batcher = None
+    alerts = None
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        instrumentation.count("http_responses_total", path=self._route, status=status)
+
+    @property
+    def _route(self):
+        return urlsplit(self.path).path
+
+    def do_GET(self):
+        with instrumentation.timer("http_request_seconds", method="GET", path=self._route):
+            self._get()
+
+    def do_POST(self):
+        with instrumentation.timer("http_request_seconds", method="POST", path=self._route):
+            self._post()
+
+    def _get(self):
+        if self._route == "/metrics":
+            self._send(200, instrumentation.METRICS.to_prometheus(),
+                       "text/plain; version=0.0.4")
+        elif self._route == "/health":
+            self._send(200, {
+                "status": "ok",
+                "batches": self.batcher.batches,
+                "records": self.batcher.records,
+                "model_version": getattr(self.batcher.model, "version", None),
+                "cache": self.batcher.cache.stats(),
+            })
+        elif self._route == "/alerts":
+            self._send(200, self.alerts.sync().to_json())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _post(self):
+        url = urlsplit(self.path)
+        if url.path != "/predict":
+            self._send(404, {"error": "not found"})
+            return
+        profiling = parse_qs(url.query).get("profile") == ["1"]
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            records = validate(json.loads(self.rfile.read(length)))
+        except (ValueError, json.JSONDecodeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+
+        if profiling:
+            # ?profile=1 scores this request alone under cProfile
+            try:
+                with instrumentation.profile("predict") as prof:
+                    predictions = self.batcher.score_now(records)
+            except Exception as exc:
+                self._send(500, {"error": str(exc)})
+                return
+            self._send(200, {"predictions": predictions, "profile": prof})
+            return
+
+        try:
+            predictions = self.batcher.submit(records).result(REQUEST_TIMEOUT)
+        except Exception as exc:
+            self._send(500, {"error": str(exc)})
+            return
+
+        self._send(200, {"predictions": predictions})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # bursts open many connections at once; the default backlog of 5 drops them
+    request_queue_size = 256
+
+
+def make_server(model, host=HOST, port=PORT, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS,
+                cache=None):
+    handler = type("BoundHandler", (Handler,), {
+        "batcher": MicroBatcher(model, max_batch, max_wait_ms / 1000, cache),
+        "alerts": AlertEngine(),
+    })
+    return Server((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="HTTP/JSON severity prediction service with micro-batching."
+    )
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--cache-size", type=int, default=MAX_ENTRIES,
+                        help="cached predictions kept (0 disables the cache)")
+    parser.add_argument("--cache-ttl", type=float, default=TTL_SECONDS, help="seconds")
+    args = parser.parse_args()
+
+    server = make_server(
+        load_model(), args.host, args.port, args.max_batch, args.max_wait_ms,
+        PredictionCache(args.cache_size, args.cache_ttl),
+    )
+    print(f"✅ Serving severity model on http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
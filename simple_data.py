@@ -1,5 +1,7 @@
 import pandas as pd
 
+import store
+
 print(">>> Running simple_data.py")
 
 data = [
@@ -46,5 +48,5 @@ df = pd.DataFrame(data)
 print("\nSample disaster data:")
 print(df)
 
-df.to_csv("incidents_small.csv", index=False)
-print("\nSaved to incidents_small.csv")
+store.write_table("incidents_small", df)
+print(f"\nSaved to {store.table_dir('incidents_small')}/")
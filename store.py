@@ -0,0 +1,210 @@
+import argparse
+import glob
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import instrumentation
+
+DATA_DIR = "data"
+
+
+# ---------------------------------
+# PATHS
+# ---------------------------------
+# Each table is a directory of Parquet parts: data/<name>/part-00000.parquet, ...
+# Tables that have never been written fall back to the <name>.csv seed file.
+def table_dir(name):
+    return os.path.join(DATA_DIR, name)
+
+
+def csv_path(name):
+    return f"{name}.csv"
+
+
+def list_parts(name):
+    return sorted(glob.glob(os.path.join(table_dir(name), "part-*.parquet")))
+
+
+def exists(name):
+    return bool(list_parts(name)) or os.path.exists(csv_path(name))
+
+
+def table_version(name):
+    # cheap cache key that changes whenever a table is rewritten or appended to
+    parts = list_parts(name)
+    if parts:
+        return tuple((os.path.basename(p), os.path.getmtime(p)) for p in parts)
+    path = csv_path(name)
+    return (path, os.path.getmtime(path)) if os.path.exists(path) else None
+
+
+def changed_parts(name, since):
+    # For incremental consumers. Returns (version, new_parts); new_parts is
+    # None when the table was rewritten (or is still a CSV seed) and the
+    # caller has to start over from a full read.
+    version = table_version(name)
+    parts = list_parts(name)
+
+    appended = (
+        since
+        and parts
+        and isinstance(since[0], tuple)
+        and version[:len(since)] == since
+    )
+    if appended:
+        return version, parts[len(since):]
+    return version, None
+
+
+# ---------------------------------
+# WRITE
+# ---------------------------------
+def _to_arrow(df):
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype("category")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # fixed index width so parts written with different dictionaries still
+    # share one schema
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+        if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def _write_part(table, path):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def begin_write(name):
+    # staging directory that commit_write() later swaps in for the table
+    staging = f"{table_dir(name)}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(staging)
+    return staging
+
+
+def write_part(staging, index, df):
+    # safe to call from several processes at once, one index each
+    path = os.path.join(staging, f"part-{index:05d}.parquet")
+    _write_part(_to_arrow(df), path)
+    return path
+
+
+def commit_write(name, staging):
+    final = table_dir(name)
+    old = None
+    if os.path.exists(final):
+        old = f"{final}.{uuid.uuid4().hex}.old"
+        os.replace(final, old)
+    os.replace(staging, final)
+    if old:
+        shutil.rmtree(old)
+    return final
+
+
+def abort_write(staging):
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def write_parts(name, frames):
+    # stream DataFrames into a staging directory, one part each, then swap it
+    # in place of the old table so readers never see a half-written table
+    staging = begin_write(name)
+    try:
+        for i, df in enumerate(frames):
+            write_part(staging, i, df)
+    except BaseException:
+        abort_write(staging)
+        raise
+    return commit_write(name, staging)
+
+
+def write_table(name, df):
+    return write_parts(name, [df])
+
+
+def append_table(name, df):
+    if not list_parts(name):
+        if os.path.exists(csv_path(name)):
+            # first append to a CSV-seeded table: materialise the seed first
+            write_table(name, read_table(name))
+        else:
+            return write_table(name, df)
+
+    parts = list_parts(name)
+    last = int(os.path.basename(parts[-1])[5:10])
+    path = os.path.join(table_dir(name), f"part-{last + 1:05d}.parquet")
+    _write_part(_to_arrow(df), path)
+    return path
+
+
+# ---------------------------------
+# READ
+# ---------------------------------
+def read_table(name, columns=None, parts=None, categorical=True):
+    # categorical=False: string columns as plain objects (see plain())
+    with instrumentation.timer("store_read_seconds", table=name):
+        df = _read(name, columns, parts)
+    instrumentation.count("store_rows_read_total", len(df), table=name)
+    return df if categorical else plain(df)
+
+
+def plain(df):
+    """``df`` with its categorical columns as plain objects.
+
+    Every part has its own dictionary, so frames read separately (old parts
+    and an appended delta) have different categories and concat to a mix.
+    Plain columns concat and compare cleanly.
+    """
+    cats = df.select_dtypes("category").columns
+    return df.astype({c: object for c in cats})
+
+
+def _read(name, columns, parts):
+    if parts is None:
+        parts = list_parts(name)
+
+    if parts:
+        table = pq.read_table(parts, columns=columns, memory_map=True)
+        return table.to_pandas()
+
+    path = csv_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No table '{name}' in {DATA_DIR}/ and no {path}")
+
+    df = pd.read_csv(path, usecols=columns)
+    if columns is not None:
+        df = df[columns]
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert CSV datasets into the Parquet dataset store."
+    )
+    parser.add_argument("tables", nargs="+", help="table names, e.g. final_dataset")
+    args = parser.parse_args()
+
+    for name in args.tables:
+        df = pd.read_csv(csv_path(name))
+        write_table(name, df)
+        print(f"✅ {csv_path(name)} → {table_dir(name)}/ ({len(df)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_score import score_chunk
+
+INCIDENT = {
+    "state": "Gujarat", "city": "Vadodara", "disaster_type": "Cyclone", "month": 4,
+    "year": 2020, "casualties": 22, "economic_loss_crores": 64.11, "response_time_hours": 16.4,
+}
+
+
+class StaticModel:
+    classes_ = np.array(["High", "Low"], dtype=object)
+
+    def predict_proba(self, X):
+        return np.tile([0.25, 0.75], (len(X), 1))
+
+
+def test_scores_a_chunk():
+    scored = score_chunk(StaticModel(), pd.DataFrame([INCIDENT]))
+    assert scored["season"].tolist() == ["Summer"]
+    assert scored["predicted_severity"].tolist() == ["Low"]
+    assert scored["proba_High"].tolist() == [0.25]
+
+
+@pytest.mark.parametrize("column", ["month", "city"])
+def test_missing_columns(column):
+    chunk = pd.DataFrame([INCIDENT]).drop(columns=column)
+    with pytest.raises(ValueError, match=f"Missing required columns: \\['{column}'\\]"):
+        score_chunk(StaticModel(), chunk)
@@ -0,0 +1,19 @@
+from benchmarks import synthetic
+from clean_emdat_data import cleaned_chunks
+
+
+def test_stats_are_per_call(tmp_path):
+    path = tmp_path / "emdat_raw.csv"
+    synthetic.emdat_raw(2_500).to_csv(path, index=False)
+    with open(path, "a") as f:
+        f.write(",".join("x" * 20) + "\n")  # too many fields: skipped
+
+    runs = []
+    for _ in range(2):
+        stats = {}
+        kept = sum(len(c) for c in cleaned_chunks(path, 1_000, verbose=False, stats=stats))
+        runs.append(stats)
+        assert stats["kept"] == kept
+
+    assert runs[0] == runs[1]
+    assert runs[0]["read"] == 2_500 and runs[0]["skipped_lines"] == 1
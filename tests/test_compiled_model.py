@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from compiled_model import CompiledForest, export
+from features import FEATURES
+from model_selection import severity_preprocessor
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "final_dataset.csv")
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return pd.read_csv(DATASET)
+
+
+@pytest.fixture(scope="module")
+def pipeline(dataset):
+    # same pipeline as train_final_model.py, fewer trees
+    return Pipeline(steps=[
+        ("preprocess", severity_preprocessor()),
+        ("model", RandomForestClassifier(
+            n_estimators=50, class_weight="balanced", random_state=42)),
+    ]).fit(dataset[FEATURES], dataset["severity"])
+
+
+@pytest.fixture(scope="module")
+def compiled(pipeline):
+    return export(pipeline)
+
+
+def assert_parity(pipeline, compiled, X):
+    label, proba = compiled.predict_with_proba(X)
+    np.testing.assert_allclose(proba, pipeline.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(label, pipeline.predict(X))
+
+
+def test_parity_on_dataset(pipeline, compiled, dataset):
+    assert_parity(pipeline, compiled, dataset[FEATURES])
+
+
+def test_parity_across_blocks_with_repeats(pipeline, compiled, dataset):
+    idx = np.random.default_rng(0).integers(0, len(dataset), 2 * compiled.block_rows + 7)
+    assert_parity(pipeline, compiled, dataset[FEATURES].iloc[idx].reset_index(drop=True))
+
+
+def test_parity_single_row(pipeline, compiled, dataset):
+    assert_parity(pipeline, compiled, dataset[FEATURES].iloc[[3]])
+
+
+def test_parity_unknown_categories(pipeline, compiled, dataset):
+    X = dataset[FEATURES].head(20).copy()
+    X.loc[::2, "city"] = "Atlantis"
+    X.loc[::3, "disaster_type"] = "Meteor"
+    assert_parity(pipeline, compiled, X)
+
+
+def test_saved_arrays_match(compiled, dataset, tmp_path):
+    compiled.save(tmp_path / "compiled")
+    loaded = CompiledForest.load(tmp_path / "compiled")
+    X = dataset[FEATURES]
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+
+
+def test_contributions_add_up_to_proba(pipeline, compiled, dataset):
+    X = dataset[FEATURES].head(500)
+    bias, contrib = compiled.contributions_encoded(compiled.encode(X))
+    assert contrib.shape == (len(X), len(compiled.features), len(compiled.classes_))
+    np.testing.assert_allclose(bias + contrib.sum(axis=1), pipeline.predict_proba(X),
+                               rtol=0, atol=1e-12)
+
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+import store
+from feed_consumer import consume, load_checkpoint
+
+INCIDENT = {
+    "incident_id": 1, "state": "Gujarat", "city": "Vadodara", "disaster_type": "Cyclone",
+    "month": 4, "year": 2020, "casualties": 22, "economic_loss_crores": 64.11,
+    "response_time_hours": 16.4,
+}
+
+
+class StaticModel:
+    """Stands in for LazyModel: P(High) = 1 for every row."""
+
+    version = "test-feed"
+    classes_ = np.array(["High", "Low"], dtype=object)
+
+    def get(self):
+        return self
+
+    def predict_proba(self, X):
+        return np.tile([1.0, 0.0], (len(X), 1))
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "DATA_DIR", str(tmp_path / "data"))
+    return tmp_path / "feed.jsonl"
+
+
+def write(feed, records):
+    with open(feed, "a") as f:
+        for r in records:
+            f.write((r if isinstance(r, str) else json.dumps(r)) + "\n")
+
+
+def incidents(ids, **changes):
+    return [{**INCIDENT, "incident_id": i, "casualties": i, **changes} for i in ids]
+
+
+def run(feed):
+    return consume(str(feed), "scored", follow=False, model=StaticModel())
+
+
+def scored_ids():
+    return sorted(store.read_table("scored")["incident_id"].tolist())
+
+
+def test_malformed_lines_are_rejected_not_fatal(feed):
+    write(feed, incidents([1, 2]) + incidents([3], state=7) + ["{not json"]
+          + incidents([4], casualties=2.7) + incidents([5]))
+    stats = run(feed)
+
+    assert stats["scored"] == 3 and stats["rejected"] == 3
+    assert scored_ids() == [1, 2, 5]
+    assert load_checkpoint("scored")["offset"] == feed.stat().st_size
+
+
+def test_resumes_from_checkpoint(feed):
+    write(feed, incidents([1, 2, 3]))
+    assert run(feed)["scored"] == 3
+
+    write(feed, incidents([4, 5]))
+    stats = run(feed)
+    assert stats["events"] == 2 and stats["scored"] == 2
+    assert scored_ids() == [1, 2, 3, 4, 5]
+
+    # nothing new: nothing scored twice
+    assert run(feed)["events"] == 0
+    assert scored_ids() == [1, 2, 3, 4, 5]
@@ -0,0 +1,89 @@
+import os
+
+import pandas as pd
+import pytest
+
+import pipeline
+import store
+from ingest import ingest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # scratch copy of risk_new.csv; the store and pipeline state go under it
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store, "DATA_DIR", "data")
+    pd.read_csv(os.path.join(ROOT, "risk_new.csv")).head(100).to_csv("risk_new.csv", index=False)
+    return tmp_path
+
+
+def incidents(ids, **changes):
+    rows = pd.read_csv(os.path.join(ROOT, "risk_new.csv")).head(len(ids)).copy()
+    rows["incident_id"] = ids
+    return rows.assign(**changes)
+
+
+def table_ids():
+    return sorted(store.read_table("final_dataset")["incident_id"].tolist())
+
+
+def test_ingested_rows_survive_a_pipeline_run(workdir):
+    stages = [pipeline.Stage("prepare", os.path.join(ROOT, "prepare_final_dataset.py"),
+                             inputs=["risk_new.csv"], outputs=["data/final_dataset"])]
+    assert pipeline.run(stages=stages)["prepare"].startswith("ran")
+    assert len(table_ids()) == 100
+
+    _, _, stats = ingest(incidents([10_001, 10_002, 10_003]))
+    assert stats["appended"] == 3
+
+    # the append makes the stage stale; rerunning it must keep those rows
+    assert pipeline.run(stages=stages)["prepare"].startswith("ran")
+    assert table_ids() == list(range(1, 101)) + [10_001, 10_002, 10_003]
+    assert pipeline.run(stages=stages)["prepare"] == "up to date"
+
+
+def test_duplicates_conflicts_and_invalid_rows(workdir):
+    store.write_table("final_dataset", incidents([1, 2]).assign(season="Summer", risk_score=0.0))
+
+    batch = pd.concat([
+        incidents([1]),                             # stored already
+        incidents([2], casualties=999),             # stored with other content
+        incidents([3]), incidents([3]),             # exact repeat in the batch
+        incidents([4], city=" Vadodara "),          # new; padded repeat below
+        incidents([4], city="Vadodara"),
+        incidents([5], month=13),                   # fails clean()
+    ], ignore_index=True)
+    fresh, rejected, stats = ingest(batch)
+
+    assert sorted(fresh["incident_id"]) == [3, 4]
+    assert stats == {"received": 7, "appended": 2, "duplicates": 3, "conflicts": 1,
+                     "invalid": 1}
+    assert sorted(zip(rejected["incident_id"], rejected["reason"])) == [
+        (2, "conflict"), (5, "invalid")]
+    assert table_ids() == [1, 2, 3, 4]
+
+    # the same batch again appends nothing
+    assert ingest(batch)[2]["appended"] == 0
+
+
+def test_missing_columns(workdir):
+    with pytest.raises(ValueError, match="Missing required columns"):
+        ingest(incidents([1]).drop(columns="severity"))
+
+
+def test_rows_clean_would_coerce_are_invalid(workdir):
+    batch = pd.concat([
+        incidents([1], casualties=2.7),             # not truncated to 2
+        incidents([2], city=7),
+        incidents([3], state="  "),
+        incidents([4], casualties=3.0),             # whole number: fine
+    ], ignore_index=True)
+    fresh, rejected, stats = ingest(batch)
+
+    assert fresh["incident_id"].tolist() == [4]
+    assert fresh["casualties"].tolist() == [3]
+    assert sorted(rejected.loc[rejected["reason"] == "invalid", "incident_id"]) == [1, 2, 3]
+    assert stats["invalid"] == 3
+    assert table_ids() == [4]
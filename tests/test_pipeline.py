@@ -0,0 +1,26 @@
+import os
+
+import pipeline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_stage_code_follows_imports(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    stages = {s.name: s for s in pipeline.STAGES}
+    code = pipeline.local_modules(stages["train_severity"].script)
+    # imported by train_final_model.py, and compiled_model.py via registry.py
+    for module in ["store.py", "features.py", "instrumentation.py", "registry.py",
+                   "compiled_model.py"]:
+        assert module in code
+
+
+def test_stage_key_changes_with_imported_module(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "helper.py").write_text("X = 1\n")
+    (tmp_path / "stage.py").write_text("def main():\n    import helper\n")
+    stage = pipeline.Stage("s", "stage.py", inputs=[], outputs=[])
+
+    before = pipeline.stage_key(stage, {})
+    (tmp_path / "helper.py").write_text("X = 2\n")
+    assert pipeline.stage_key(stage, {}) != before
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from prediction_cache import PredictionCache, predict_proba
+
+INCIDENT = {
+    "state": "Gujarat", "city": "Vadodara", "disaster_type": "Cyclone", "month": 4,
+    "year": 2020, "casualties": 22, "economic_loss_crores": 64.11, "response_time_hours": 16.4,
+}
+
+
+class CountingModel:
+    classes_ = np.array(["High", "Low"], dtype=object)
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X):
+        self.rows += len(X)
+        p = (X["casualties"].to_numpy() % 10) / 10
+        return np.column_stack([p, 1 - p])
+
+
+def frame(casualties):
+    return pd.DataFrame([{**INCIDENT, "casualties": c} for c in casualties])
+
+
+def test_repeats_are_scored_once():
+    model, cache = CountingModel(), PredictionCache()
+    df = frame([1, 2, 1, 3, 2])
+    # same request with cosmetic differences: padded text, 64.1100001
+    df.loc[2, "city"] = " Vadodara "
+    df.loc[2, "economic_loss_crores"] = 64.1100001
+
+    proba = predict_proba(model, "v1", df, cache)
+    np.testing.assert_allclose(proba, CountingModel().predict_proba(frame([1, 2, 1, 3, 2])))
+    assert model.rows == 3
+
+    predict_proba(model, "v1", frame([3, 4]), cache)
+    assert model.rows == 4
+    assert cache.stats()["hits"] == 3
+
+    # a new model version starts cold
+    predict_proba(model, "v2", frame([3]), cache)
+    assert model.rows == 5
+
+
+def test_cached_rows_do_not_keep_the_batch_alive():
+    cache = PredictionCache()
+    predict_proba(CountingModel(), "v1", frame(range(100)), cache)
+    assert all(value.base is None for _, value in cache._entries.values())
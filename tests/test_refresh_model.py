@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+import refresh_model
+import registry
+import store
+from features import FEATURES
+from model_selection import severity_preprocessor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(registry, "REGISTRY_DIR", str(tmp_path / "registry"))
+    for name in ["MODEL_PATH", "STATE_PATH", "REPLAY_PATH"]:
+        path = os.path.basename(getattr(refresh_model, name))
+        monkeypatch.setattr(refresh_model, name, str(tmp_path / path))
+    store.write_table("final_dataset", pd.read_csv(os.path.join(ROOT, "final_dataset.csv")))
+
+
+def train(**info):
+    # what train_final_model.py records, with far fewer trees
+    version = store.table_version("final_dataset")
+    df = store.read_table("final_dataset")
+    clf = Pipeline(steps=[
+        ("preprocess", severity_preprocessor()),
+        ("model", RandomForestClassifier(n_estimators=5, random_state=0)),
+    ]).fit(df[FEATURES], df["severity"])
+    registry.register("severity", clf, data_hash=registry.table_hash("final_dataset"),
+                      **{"table_version": version, **info})
+    return len(df)
+
+
+def append(n):
+    rows = pd.read_csv(os.path.join(ROOT, "final_dataset.csv")).head(n)
+    store.append_table("final_dataset", rows.assign(incident_id=rows["incident_id"] + 100_000))
+
+
+def test_baseline_when_model_covers_the_table(workdir):
+    rows = train()
+    assert refresh_model.refresh(n_trees=2) == ("baseline", rows)
+    assert refresh_model.refresh(n_trees=2) == ("up to date", 0)
+
+    append(30)
+    assert refresh_model.refresh(n_trees=2) == ("refreshed", 30)
+
+
+def test_rows_appended_before_the_first_run_are_learned(workdir):
+    rows = train()
+    append(50)
+
+    assert refresh_model.refresh(n_trees=2) == ("refreshed", 50)
+    state = refresh_model.load_state()
+    assert state["seen"] == rows + 50
+    assert registry.metadata("severity")["refresh"]["rows"] == 50
+
+
+def test_refuses_when_training_data_is_unknown(workdir):
+    train(table_version=None)
+    append(50)
+    with pytest.raises(SystemExit, match="train_final_model.py"):
+        refresh_model.refresh(n_trees=2)
+    assert refresh_model.load_state() is None
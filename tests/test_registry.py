@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+import registry
+from compiled_model import export
+from features import FEATURES
+from model_selection import severity_preprocessor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def trained():
+    df = pd.read_csv(os.path.join(ROOT, "final_dataset.csv"))
+    pipeline = Pipeline(steps=[
+        ("preprocess", severity_preprocessor()),
+        ("model", RandomForestClassifier(n_estimators=5, random_state=0)),
+    ]).fit(df[FEATURES], df["severity"])
+    return pipeline, df[FEATURES].head(50)
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "REGISTRY_DIR", str(tmp_path / "registry"))
+
+
+def test_compiled_part_is_memory_mapped(trained, registry_dir):
+    pipeline, X = trained
+    registry.register("severity", pipeline, compiled=export(pipeline))
+
+    lazy = registry.LazyModel("severity", part="compiled")
+    compiled = lazy.get()
+    assert lazy.version == "v0001"
+    assert isinstance(compiled.value, np.memmap)
+    np.testing.assert_allclose(compiled.predict_proba(X), pipeline.predict_proba(X), atol=1e-12)
+
+
+def test_compiled_part_exported_when_missing(trained, registry_dir):
+    pipeline, X = trained
+    version = registry.register("severity", pipeline)
+    compiled = registry.load("severity", version, part="compiled")
+    np.testing.assert_allclose(compiled.predict_proba(X), pipeline.predict_proba(X), atol=1e-12)
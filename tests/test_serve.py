@@ -0,0 +1,78 @@
+import json
+import threading
+import urllib.request
+from concurrent.futures import wait
+
+import numpy as np
+import pytest
+
+from prediction_cache import PredictionCache
+from serve import MicroBatcher, make_server, validate
+
+INCIDENT = {
+    "state": "Gujarat", "city": "Vadodara", "disaster_type": "Cyclone", "month": 4,
+    "year": 2020, "casualties": 22, "economic_loss_crores": 64.11, "response_time_hours": 16.4,
+}
+
+
+class CityModel:
+    """P(High) = 1 for every row; raises on one city so batches can fail."""
+
+    classes_ = np.array(["High", "Low"], dtype=object)
+
+    def predict_proba(self, X):
+        if (X["city"] == "Broken").any():
+            raise RuntimeError("cannot score Broken")
+        return np.tile([1.0, 0.0], (len(X), 1))
+
+
+def test_validate_converts_types():
+    record = validate({**INCIDENT, "month": "4", "casualties": 22.0, "year": 2020})[0]
+    assert record["month"] == 4 and isinstance(record["month"], int)
+    assert record["casualties"] == 22 and isinstance(record["casualties"], int)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("month", "x"),
+    ("month", 4.5),
+    ("economic_loss_crores", None),
+    ("economic_loss_crores", float("nan")),
+    ("casualties", True),
+    ("casualties", 10 ** 30),
+    ("city", 3),
+    ("state", " "),
+    ("month", 13),
+    ("month", 0),
+    ("casualties", -1),
+    ("economic_loss_crores", -0.5),
+    ("response_time_hours", 0),
+])
+def test_validate_rejects_bad_fields(field, value):
+    with pytest.raises(ValueError, match=field):
+        validate([INCIDENT, {**INCIDENT, field: value}])
+
+
+def test_failed_batch_only_fails_the_bad_request():
+    # a long wait window so every request lands in one micro-batch
+    batcher = MicroBatcher(CityModel(), max_batch=64, max_wait=0.5, cache=PredictionCache())
+    good = [batcher.submit([{**INCIDENT, "casualties": i}]) for i in range(10)]
+    bad = batcher.submit([{**INCIDENT, "city": "Broken"}])
+    wait(good + [bad], timeout=10)
+
+    assert all(f.result()[0]["severity"] == "High" for f in good)
+    with pytest.raises(RuntimeError):
+        bad.result()
+
+
+def test_get_routes_ignore_the_query_string():
+    server = make_server(CityModel(), port=0, cache=PredictionCache())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics?x=1") as r:
+            assert r.status == 200
+        with urllib.request.urlopen(f"{url}/health?verbose=1") as r:
+            assert json.load(r)["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
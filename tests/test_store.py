@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+import store
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "DATA_DIR", str(tmp_path / "data"))
+
+
+def test_parts_read_separately_concat_as_plain_strings():
+    store.write_table("t", pd.DataFrame({"city": ["Pune", "Surat"], "n": [1, 2]}))
+    store.append_table("t", pd.DataFrame({"city": ["Agra"], "n": [3]}))
+    first, second = ([p] for p in store.list_parts("t"))
+
+    old = store.read_table("t", parts=first)
+    assert isinstance(old["city"].dtype, pd.CategoricalDtype)
+
+    merged = pd.concat([store.read_table("t", parts=first, categorical=False),
+                        store.read_table("t", parts=second, categorical=False)],
+                       ignore_index=True)
+    assert merged["city"].tolist() == ["Pune", "Surat", "Agra"]
+    assert merged["city"].dtype == object
+    pd.testing.assert_frame_equal(merged, store.plain(store.read_table("t")))
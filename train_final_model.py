@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
@@ -8,21 +7,25 @@ from sklearn.metrics import classification_report, accuracy_score
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 
-DATA_PATH = "final_dataset.csv"
+import instrumentation
+import registry
+import store
+from compiled_model import export
+from features import CAT_FEATURES, NUM_FEATURES
+
+DATA_TABLE = "final_dataset"
 MODEL_PATH = "models/severity_model.pkl"
 
 # 1) Load data
-df = pd.read_csv(DATA_PATH)
+cat_features = CAT_FEATURES
+num_features = NUM_FEATURES
+
+# recorded with the model: refresh_model.py folds in only parts appended after it
+table_version = store.table_version(DATA_TABLE)
+df = store.read_table(DATA_TABLE, columns=cat_features + num_features + ["severity"])
 print("Rows in final_dataset:", len(df))
 
 # 2) Features & target
-cat_features = ["state", "city", "disaster_type", "season"]
-num_features = [
-    "month", "year",
-    "casualties",
-    "economic_loss_crores",
-    "response_time_hours"
-]
 
 X = df[cat_features + num_features]
 y = df["severity"]
@@ -54,11 +57,14 @@ clf = Pipeline(
 )
 
 # 5) Train model
-clf.fit(X_train, y_train)
+with instrumentation.timer("train_fit_seconds", model="severity"):
+    clf.fit(X_train, y_train)
 
 # 6) Evaluation
-y_pred = clf.predict(X_test)
-print("\n🎯 Accuracy:", accuracy_score(y_test, y_pred))
+with instrumentation.timer("model_predict_seconds", model="severity"):
+    y_pred = clf.predict(X_test)
+accuracy = accuracy_score(y_test, y_pred)
+print("\n🎯 Accuracy:", accuracy)
 
 print("\n📊 Classification Report:")
 print(classification_report(y_test, y_pred))
@@ -67,5 +73,18 @@ print(classification_report(y_test, y_pred))
 os.makedirs("models", exist_ok=True)
 joblib.dump(clf, MODEL_PATH)
 
+with instrumentation.timer("train_register_seconds", model="severity"):
+    version = registry.register(
+        "severity", clf,
+        data_hash=registry.table_hash(DATA_TABLE),
+        metrics={"accuracy": accuracy},
+        features=cat_features + num_features,
+        params=model.get_params(),
+        compiled=export(clf),
+        table_version=table_version,
+    )
+
 print(f"\n✅ Model training complete")
 print(f"✅ Saved model to: {MODEL_PATH}")
+print(f"✅ Registered as severity {version}")
+print(f"✅ Timings → {instrumentation.write_run_summary('train_final_model')}")
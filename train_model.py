@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -8,8 +7,11 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 
+import registry
+import store
+
 # 1) Load the full dataset
-df = pd.read_csv("incidents_full.csv")
+df = store.read_table("incidents_full")
 
 X = df[[
     "state",
@@ -63,7 +65,15 @@ print(classification_report(y_test, y_pred))
 print("Confusion matrix:")
 print(confusion_matrix(y_test, y_pred))
 
-# 6) Save model
+# 6) Save model (separate name, so it no longer clobbers the final model)
 os.makedirs("models", exist_ok=True)
-joblib.dump(clf, "models/severity_model.pkl")
-print("\n✅ Model saved to models/severity_model.pkl")
+joblib.dump(clf, "models/severity_basic.pkl")
+version = registry.register(
+    "severity_basic", clf,
+    data_hash=registry.table_hash("incidents_full"),
+    metrics={"accuracy": float((y_pred == y_test).mean())},
+    features=cat_features + num_features,
+    params=model.get_params(),
+)
+print("\n✅ Model saved to models/severity_basic.pkl")
+print(f"✅ Registered as severity_basic {version}")
@@ -1,23 +1,19 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 
-DATA_FILE = "risk_processed.csv"
+import instrumentation
+import registry
+import store
+from features import RISK_FEATURES
 
-df = pd.read_csv(DATA_FILE)
+DATA_TABLE = "risk_processed"
 
-X = df[[
-    "wri",
-    "exposure",
-    "vulnerability",
-    "susceptibility",
-    "coping",
-    "adaptive",
-    "year"
-]]
+df = store.read_table(DATA_TABLE)
+
+X = df[RISK_FEATURES]
 
 y = df["risk_category"]
 
@@ -34,15 +30,29 @@ model = RandomForestClassifier(
     random_state=42
 )
 
-model.fit(X_train, y_train)
+with instrumentation.timer("train_fit_seconds", model="risk"):
+    model.fit(X_train, y_train)
 
-y_pred = model.predict(X_test)
+with instrumentation.timer("model_predict_seconds", model="risk"):
+    y_pred = model.predict(X_test)
 
-print("\nModel Accuracy:", accuracy_score(y_test, y_pred))
+accuracy = accuracy_score(y_test, y_pred)
+print("\nModel Accuracy:", accuracy)
 print("\nClassification Report:")
 print(classification_report(y_test, y_pred))
 
 joblib.dump(model, "risk_model.pkl")
 joblib.dump(encoder, "label_encoder.pkl")
 
+version = registry.register(
+    "risk", model,
+    data_hash=registry.table_hash(DATA_TABLE),
+    metrics={"accuracy": accuracy},
+    features=list(X.columns),
+    params=model.get_params(),
+    extras={"label_encoder": encoder},
+)
+
 print("\n✅ Model saved as: risk_model.pkl")
+print(f"✅ Registered as risk {version}")
+print(f"✅ Timings → {instrumentation.write_run_summary('train_risk_model')}")